@@ -4,106 +4,282 @@ document.addEventListener('DOMContentLoaded', () => {
     const dateFilter = document.getElementById('filter-fecha');
     const matchCount = document.getElementById('match-count');
 
-    let allMatches = [];
-    let competitions = new Set();
-    let dates = new Set();
+    // Generated by fixture_export.py: index.json + one shard per (fecha, competencia).
+    // Committed next to fixture_output.csv; the CSV is only a fallback for old exports.
+    const EXPORT_DIR = 'fixture_export/';
+    const FALLBACK_CSV = 'fixture_output.csv';
+    const PAGE_SIZE = 40;
 
-    async function loadFixture() {
-        try {
-            const response = await fetch('fixture_output.csv');
-            if (!response.ok) throw new Error('No se pudo cargar el archivo CSV');
+    // Precomputed lookup maps, filled once from the manifest (or the CSV fallback)
+    let fechas = [];                    // sorted fecha numbers
+    let compOrder = [];                 // competition keys in display order
+    const labelToComp = new Map();      // filter label ("INF A 5ª") → competition key
+    const shardIndex = new Map();       // "fecha|ck" → { archivo, filas: { label: count } }
+    const shardCache = new Map();       // "fecha|ck" → Promise<{ label: [[local, visitante]] }>
+
+    // Incremental rendering state for the current filter
+    let renderToken = 0;
+    let pendingKeys = [];               // shards not fetched yet, in display order
+    let queue = [];                     // fetched matches not drawn yet
+    let filling = false;
 
-            const text = await response.text();
-            parseCSV(text);
+    const sentinel = document.createElement('div');
+    sentinel.className = 'grid-sentinel';
+    const observer = new IntersectionObserver(entries => {
+        if (entries.some(e => e.isIntersecting)) drawMore(renderToken);
+    }, { rootMargin: '600px' });
 
+    async function loadFixture() {
+        try {
+            try {
+                await loadManifest();
+            } catch (manifestError) {
+                await loadCSV();
+            }
             populateFilters();
-            renderMatches();
+            update();
         } catch (error) {
-            grid.innerHTML = `<div class="loader">⚠️ Error: ${error.message}</div>`;
+            grid.innerHTML = `<div class="loader">⚠️ Error: ${escapeHTML(error.message)}</div>`;
         }
     }
 
-    function parseCSV(text) {
-        const lines = text.trim().split('\n');
-        const headers = lines[0].split(',');
-
-        allMatches = lines.slice(1).map(line => {
-            const values = line.split(',');
-            const obj = {};
-            headers.forEach((header, i) => {
-                obj[header.trim()] = values[i].trim();
+    async function loadManifest() {
+        const response = await fetch(EXPORT_DIR + 'index.json');
+        if (!response.ok) throw new Error('No se pudo cargar el índice');
+        const index = await response.json();
+
+        compOrder = Object.keys(index.competencias);
+        compOrder.forEach(ck => {
+            index.competencias[ck].categorias.forEach(label => labelToComp.set(label, ck));
+        });
+        fechas = Object.keys(index.fechas).map(Number).sort((a, b) => a - b);
+        Object.entries(index.shards).forEach(([fecha, comps]) => {
+            Object.entries(comps).forEach(([ck, shard]) => {
+                shardIndex.set(`${fecha}|${ck}`, shard);
             });
+        });
+    }
+
+    async function loadCSV() {
+        // Fallback without index: whole CSV, grouped into in-memory shards
+        const response = await fetch(FALLBACK_CSV);
+        if (!response.ok) throw new Error('No se pudo cargar el archivo CSV');
 
-            competitions.add(obj.competencia);
-            dates.add(parseInt(obj.fecha));
+        const rows = parseCSV(await response.text());
+        const headers = rows.shift().map(h => h.trim());
+        const col = name => headers.indexOf(name);
+        const [iComp, iFecha, iLocal, iVisit] =
+            ['competencia', 'fecha', 'local', 'visitante'].map(col);
 
-            return obj;
+        const shards = new Map();
+        const dates = new Set();
+        rows.forEach(values => {
+            const label = values[iComp].trim();
+            const fecha = parseInt(values[iFecha], 10);
+            if (!label || Number.isNaN(fecha)) return;
+            // Without the index every label is its own competition
+            labelToComp.set(label, label);
+            dates.add(fecha);
+            const key = `${fecha}|${label}`;
+            if (!shards.has(key)) shards.set(key, { [label]: [] });
+            shards.get(key)[label].push([values[iLocal].trim(), values[iVisit].trim()]);
         });
+
+        compOrder = Array.from(labelToComp.keys()).sort();
+        fechas = Array.from(dates).sort((a, b) => a - b);
+        shards.forEach((filas, key) => {
+            const counts = {};
+            Object.entries(filas).forEach(([label, list]) => { counts[label] = list.length; });
+            shardIndex.set(key, { archivo: null, filas: counts });
+            shardCache.set(key, Promise.resolve(filas));
+        });
+    }
+
+    function parseCSV(text) {
+        // RFC 4180: quoted fields may contain commas, quotes ("") and newlines
+        const rows = [];
+        let row = [], field = '', quoted = false;
+        for (let i = 0; i < text.length; i++) {
+            const c = text[i];
+            if (quoted) {
+                if (c === '"' && text[i + 1] === '"') { field += '"'; i++; }
+                else if (c === '"') quoted = false;
+                else field += c;
+            } else if (c === '"') {
+                quoted = true;
+            } else if (c === ',') {
+                row.push(field); field = '';
+            } else if (c === '\n' || c === '\r') {
+                if (c === '\r' && text[i + 1] === '\n') i++;
+                row.push(field); field = '';
+                if (row.some(v => v !== '')) rows.push(row);
+                row = [];
+            } else {
+                field += c;
+            }
+        }
+        row.push(field);
+        if (row.some(v => v !== '')) rows.push(row);
+        return rows;
     }
 
     function populateFilters() {
-        // Sort and populate competitions
-        Array.from(competitions).sort().forEach(comp => {
-            const opt = document.createElement('option');
-            opt.value = comp;
-            opt.textContent = comp;
-            compFilter.appendChild(opt);
+        compOrder.forEach(ck => {
+            labelsOf(ck).forEach(label => {
+                const opt = document.createElement('option');
+                opt.value = label;
+                opt.textContent = label;
+                compFilter.appendChild(opt);
+            });
         });
 
-        // Sort and populate dates
-        Array.from(dates).sort((a, b) => a - b).forEach(date => {
+        fechas.forEach(date => {
             const opt = document.createElement('option');
             opt.value = date;
             opt.textContent = `Fecha ${date}`;
             dateFilter.appendChild(opt);
         });
+        // Start on a single fecha so only its shards are downloaded
+        if (fechas.length) dateFilter.value = String(fechas[0]);
     }
 
-    function renderMatches() {
+    function labelsOf(ck) {
+        return Array.from(labelToComp.entries())
+            .filter(([, comp]) => comp === ck)
+            .map(([label]) => label);
+    }
+
+    function selectedShards() {
         const selComp = compFilter.value;
         const selDate = dateFilter.value;
+        const dates = selDate === 'ALL' ? fechas : [Number(selDate)];
+        const comps = selComp === 'ALL' ? compOrder : [labelToComp.get(selComp)];
+        const keys = [];
+        dates.forEach(f => comps.forEach(ck => {
+            if (shardIndex.has(`${f}|${ck}`)) keys.push(`${f}|${ck}`);
+        }));
+        return keys;
+    }
 
-        const filtered = allMatches.filter(m => {
-            const matchComp = (selComp === 'ALL' || m.competencia === selComp);
-            const matchDate = (selDate === 'ALL' || m.fecha === selDate);
-            return matchComp && matchDate;
-        });
+    function countRows(keys) {
+        const selComp = compFilter.value;
+        return keys.reduce((total, key) => {
+            const filas = shardIndex.get(key).filas;
+            if (selComp !== 'ALL') return total + (filas[selComp] || 0);
+            return total + Object.values(filas).reduce((a, b) => a + b, 0);
+        }, 0);
+    }
+
+    function loadShard(key) {
+        if (!shardCache.has(key)) {
+            const promise = fetch(EXPORT_DIR + shardIndex.get(key).archivo)
+                .then(response => {
+                    if (!response.ok) throw new Error('No se pudo cargar la fecha');
+                    return response.json();
+                })
+                .then(shard => shard.filas);
+            // Drop failed downloads so the next filter change retries them
+            promise.catch(() => shardCache.delete(key));
+            shardCache.set(key, promise);
+        }
+        return shardCache.get(key);
+    }
 
-        matchCount.textContent = filtered.length;
+    function update() {
+        const token = ++renderToken;
+        pendingKeys = selectedShards();
+        queue = [];
+        filling = false;
+
+        const total = countRows(pendingKeys);
+        matchCount.textContent = total;
+        observer.disconnect();
         grid.innerHTML = '';
 
-        if (filtered.length === 0) {
+        if (total === 0) {
             grid.innerHTML = '<div class="loader">No se encontraron encuentros para los filtros seleccionados.</div>';
             return;
         }
+        grid.appendChild(sentinel);
+        observer.observe(sentinel);
+        drawMore(token);
+    }
 
-        filtered.forEach(m => {
-            const card = document.createElement('div');
-            card.className = 'match-card glass';
+    async function drawMore(token) {
+        if (filling || token !== renderToken) return;
+        filling = true;
+        try {
+            // Fetch shards lazily until there is a page worth of matches
+            const selComp = compFilter.value;
+            while (queue.length < PAGE_SIZE && pendingKeys.length) {
+                const key = pendingKeys.shift();
+                const filas = await loadShard(key);
+                if (token !== renderToken) return;
+                const fecha = key.split('|')[0];
+                Object.entries(filas).forEach(([label, matches]) => {
+                    if (selComp !== 'ALL' && label !== selComp) return;
+                    matches.forEach(([local, visitante]) => {
+                        queue.push({ competencia: label, fecha, local, visitante });
+                    });
+                });
+            }
 
-            // Generate icons based on team name hash for variety
-            const hIcon = getIcon(m.local);
-            const vIcon = getIcon(m.visitante);
+            const fragment = document.createDocumentFragment();
+            queue.splice(0, PAGE_SIZE).forEach(m => fragment.appendChild(renderCard(m)));
+            grid.insertBefore(fragment, sentinel);
 
-            card.innerHTML = `
-                <div class="match-header">
-                    <span class="comp-tag">${m.competencia}</span>
-                    <span class="date-tag">Fecha ${m.fecha}</span>
+            if (!queue.length && !pendingKeys.length) observer.disconnect();
+        } catch (error) {
+            if (token === renderToken) {
+                sentinel.insertAdjacentHTML('beforebegin',
+                    `<div class="loader">⚠️ Error: ${escapeHTML(error.message)}</div>`);
+                observer.disconnect();
+            }
+        } finally {
+            if (token === renderToken) filling = false;
+        }
+        // The page may still not fill the viewport: keep going while the sentinel shows
+        if (token === renderToken && (queue.length || pendingKeys.length) && sentinelVisible()) {
+            requestAnimationFrame(() => drawMore(token));
+        }
+    }
+
+    function sentinelVisible() {
+        return sentinel.getBoundingClientRect().top < window.innerHeight + 600;
+    }
+
+    function renderCard(m) {
+        const card = document.createElement('div');
+        card.className = 'match-card glass';
+
+        // Generate icons based on team name hash for variety
+        const hIcon = getIcon(m.local);
+        const vIcon = getIcon(m.visitante);
+
+        card.innerHTML = `
+            <div class="match-header">
+                <span class="comp-tag">${escapeHTML(m.competencia)}</span>
+                <span class="date-tag">Fecha ${escapeHTML(m.fecha)}</span>
+            </div>
+            <div class="match-teams">
+                <div class="team-row">
+                    <div class="team-icon">${hIcon}</div>
+                    <span class="team-name">${escapeHTML(m.local)}</span>
                 </div>
-                <div class="match-teams">
-                    <div class="team-row">
-                        <div class="team-icon">${hIcon}</div>
-                        <span class="team-name">${m.local}</span>
-                    </div>
-                    <div class="vs-divider">VS</div>
-                    <div class="team-row">
-                        <div class="team-icon">${vIcon}</div>
-                        <span class="team-name">${m.visitante}</span>
-                    </div>
+                <div class="vs-divider">VS</div>
+                <div class="team-row">
+                    <div class="team-icon">${vIcon}</div>
+                    <span class="team-name">${escapeHTML(m.visitante)}</span>
                 </div>
-            `;
-            grid.appendChild(card);
-        });
+            </div>
+        `;
+        return card;
+    }
+
+    function escapeHTML(value) {
+        return String(value).replace(/[&<>"']/g, c => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        })[c]);
     }
 
     function getIcon(name) {
@@ -115,8 +291,8 @@ document.addEventListener('DOMContentLoaded', () => {
         return icons[Math.abs(hash) % icons.length];
     }
 
-    compFilter.addEventListener('change', renderMatches);
-    dateFilter.addEventListener('change', renderMatches);
+    compFilter.addEventListener('change', update);
+    dateFilter.addEventListener('change', update);
 
     loadFixture();
 });
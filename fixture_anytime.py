@@ -0,0 +1,87 @@
+"""
+fixture_anytime.py  ·  Modo anytime
+====================================
+
+Cada solución mejorante que encuentra CP-SAT se escribe a disco como
+borrador publicable (JSON + CSV), con escritura atómica (archivo temporal +
+os.replace): si la corrida se corta, queda el último fixture completo, nunca
+uno a medio escribir.
+
+Parada temprana (la que ocurra primero):
+  stop_at    penalización de rachas ≤ stop_at
+  gap        gap relativo objetivo/cota ≤ gap
+  patience   N segundos sin mejorar (watchdog en un thread aparte)
+"""
+
+import json, threading, time
+
+from fixture_export import fixture_csv, write_atomic
+from fixture_telemetry import ProgressCallback, gap as rel_gap
+
+
+class AnytimeCallback(ProgressCallback):
+    """
+    ProgressCallback que además guarda cada fixture mejorante y corta la
+    búsqueda al alcanzar un criterio de parada.
+    """
+
+    def __init__(self, engine, telemetry, json_path=None, csv_path=None,
+                 stop_at=None, gap=None, patience=None):
+        super().__init__(telemetry)
+        self.engine    = engine
+        self.json_path = json_path
+        self.csv_path  = csv_path
+        self.stop_at   = stop_at
+        self.gap       = gap
+        self.patience  = patience
+        self.best      = None           # penalización de rachas del último borrador
+        self.drafts    = 0
+        self.reason    = None
+        self._last     = time.monotonic()
+        self._done     = threading.Event()
+        self._watchdog = None
+
+    def start(self):
+        """Arranca el watchdog de `patience` (llamar justo antes de Solve)."""
+        self._last = time.monotonic()
+        if self.patience:
+            self._watchdog = threading.Thread(target=self._watch, daemon=True)
+            self._watchdog.start()
+
+    def stop(self):
+        self._done.set()
+        if self._watchdog:
+            self._watchdog.join()
+
+    def _watch(self):
+        while not self._done.wait(min(1.0, self.patience / 4)):
+            if time.monotonic() - self._last >= self.patience:
+                self._stop(f"{self.patience:g}s sin mejorar")
+                return
+
+    def _stop(self, reason):
+        if self.reason is None:
+            self.reason = reason
+            self.telemetry.event("parada", motivo=reason)
+            self.StopSearch()
+
+    def on_solution_callback(self):
+        super().on_solution_callback()
+        self._last = time.monotonic()
+        eng = self.engine
+        penalty = sum(self.Value(v) for v in eng.penalties)
+        self.best = penalty
+        self.drafts += 1
+        if self.json_path or self.csv_path:
+            fixture = eng.fixture_from_values([self.Value(v) for v in eng.local])
+            if self.json_path:
+                write_atomic(self.json_path, json.dumps(fixture, indent=4, ensure_ascii=False))
+            if self.csv_path:
+                write_atomic(self.csv_path, fixture_csv(fixture, eng.csv_categories))
+        eng._log(f"   💾 borrador #{self.drafts}: rachas {penalty} · {self.WallTime():.1f}s")
+
+        if self.stop_at is not None and penalty <= self.stop_at:
+            self._stop(f"rachas {penalty} ≤ {self.stop_at}")
+        elif self.gap is not None and rel_gap(self.ObjectiveValue(),
+                                              self.BestObjectiveBound()) <= self.gap:
+            self._stop(f"gap ≤ {self.gap:g}")
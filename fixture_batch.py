@@ -0,0 +1,191 @@
+"""
+fixture_batch.py  ·  Escenarios en paralelo
+============================================
+
+Resuelve varias variantes de la misma temporada a la vez (reglas
+activadas/desactivadas, un club movido de división, parámetros del solver)
+en un pool de procesos, y arma un reporte comparativo.
+
+Cada proceso recibe una porción de los núcleos (num_search_workers =
+núcleos // escenarios en paralelo) en lugar de que cada corrida pida 8.
+
+Archivo de escenarios (JSON):
+
+  {"escenarios": [
+      {"nombre": "base"},
+      {"nombre": "sin_unicen",
+       "quitar_reglas": [["cross", "PRIMERA_A", "UNICEN", "PRIMERA_B", "Grupo Universitario"]]},
+      {"nombre": "botafogo_a", "equipos": {"BOTAFOGO F.C.": {"divisionMayor": "A"}}},
+      {"nombre": "rapido", "solver": {"max_time": 60}},
+      {"nombre": "rachas_sat", "motor": {"streak_mode": "clauses"}}
+  ]}
+
+"motor" pasa argumentos extra a FixtureEngine (streak_mode, streak_scope).
+"num_fechas" no puede ser menor que las fechas que pide el round-robin de
+fase 1 (2·(n−1) con n equipos, 2·n si n es impar): el motor lo rechaza.
+
+Un escenario que falla (override inválido, num_fechas corto) queda en el
+reporte con estado ERROR y el mensaje; el resto del batch sigue. Las reglas
+que no aplican tras los overrides (p.ej. un co_local de un club que cambió
+de división) se listan en "reglas_invalidas" de su fila: el motor las omite.
+
+Uso:
+  python fixture_batch.py escenarios.json --parallel 4 --out-dir batch_output
+"""
+
+import argparse, copy, json, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+from fixture_generator import (EQUIPOS_JSON, NUM_FECHAS, REGLAS_JSON, SCRIPT_DIR,
+                               FixtureEngine, load_equipos)
+from fixture_rules import load_reglas
+
+BATCH_DIR = os.path.join(SCRIPT_DIR, "batch_output")
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ESCENARIOS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _regla(r):
+    """Normaliza una regla leída de JSON (lista, null) a la tupla de reglas.json."""
+    return tuple(r)
+
+def apply_scenario(equipos_data, reglas, esc):
+    """Retorna (equipos, reglas) con los overrides del escenario aplicados."""
+    equipos = copy.deepcopy(equipos_data)
+    por_nombre = {e["nombre"]: e for e in equipos}
+    for nombre, cambios in esc.get("equipos", {}).items():
+        if nombre not in por_nombre:
+            raise ValueError(f"Escenario '{esc['nombre']}': equipo desconocido '{nombre}'")
+        por_nombre[nombre].update(cambios)
+
+    quitar = {_regla(r) for r in esc.get("quitar_reglas", [])}
+    faltan = quitar - set(reglas)
+    if faltan:
+        raise ValueError(f"Escenario '{esc['nombre']}': reglas inexistentes {sorted(faltan, key=str)}")
+    reglas = [r for r in reglas if r not in quitar]
+    reglas += [_regla(r) for r in esc.get("agregar_reglas", [])]
+    return equipos, reglas
+
+def run_scenario(esc, equipos_data, reglas, out_dir, workers):
+    """Resuelve un escenario (en un proceso del pool) y retorna su fila de reporte."""
+    t0 = time.perf_counter()
+    equipos, reglas = apply_scenario(equipos_data, reglas, esc)
+    engine = FixtureEngine(equipos, num_fechas=esc.get("num_fechas", NUM_FECHAS),
+                           reglas=reglas, verbose=False, **esc.get("motor", {}))
+
+    params = esc.get("solver", {})
+    result = engine.solve(max_time=params.get("max_time", 300.0),
+                          workers=params.get("workers", workers),
+                          log=False,
+                          decompose=params.get("decompose", False),
+                          parallel=1)
+
+    out = None
+    if result.ok:
+        out = os.path.join(out_dir, f"fixture_{esc['nombre']}.json")
+        engine.export(result, out)
+
+    return {
+        "nombre":    esc["nombre"],
+        "estado":    result.status_name,
+        "objetivo":  result.objective,
+        "partidos":  len(result.fixture),
+        "solve_s":   round(result.wall_time, 2),
+        "total_s":   round(time.perf_counter() - t0, 2),
+        "workers":   params.get("workers", workers),
+        "salida":    out,
+        # verbose=False calla los avisos del motor: van a la fila del reporte
+        "reglas_invalidas": engine.reglas_invalidas,
+    }
+
+def _error_row(esc, exc):
+    return {"nombre": esc["nombre"], "estado": "ERROR", "objetivo": None, "partidos": 0,
+            "solve_s": None, "total_s": None, "workers": None, "salida": None,
+            "reglas_invalidas": [], "error": f"{type(exc).__name__}: {exc}"}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BATCH
+# ══════════════════════════════════════════════════════════════════════════════
+
+def run_batch(escenarios, equipos_data=None, parallel=None, out_dir=BATCH_DIR,
+              reglas=None):
+    """
+    Resuelve todos los escenarios en un ProcessPoolExecutor.
+    Retorna las filas del reporte en el mismo orden que `escenarios`; un
+    escenario que levanta queda como fila ERROR sin cortar el batch.
+    """
+    nombres = [e["nombre"] for e in escenarios]
+    if len(set(nombres)) != len(nombres):
+        raise ValueError("Los nombres de escenario deben ser únicos")
+    if equipos_data is None:
+        equipos_data = load_equipos(EQUIPOS_JSON)
+    if reglas is None:
+        reglas = load_reglas(REGLAS_JSON)
+
+    cores    = os.cpu_count() or 1
+    parallel = max(1, min(parallel or cores, len(escenarios)))
+    workers  = max(1, cores // parallel)
+    os.makedirs(out_dir, exist_ok=True)
+
+    print(f"🔄 {len(escenarios)} escenarios · {parallel} en paralelo · "
+          f"{workers} workers CP-SAT c/u")
+    with ProcessPoolExecutor(max_workers=parallel) as pool:
+        futures = [pool.submit(run_scenario, esc, equipos_data, reglas, out_dir, workers)
+                   for esc in escenarios]
+        rows = []
+        for esc, f in zip(escenarios, futures):
+            try:
+                rows.append(f.result())
+            except Exception as exc:
+                rows.append(_error_row(esc, exc))
+        return rows
+
+def print_report(rows):
+    print("\n=== COMPARACIÓN DE ESCENARIOS ===")
+    print(f"  {'escenario':20s} {'estado':10s} {'rachas':>6s} {'solve':>8s} {'total':>8s}  salida")
+    seg = lambda s: "       -" if s is None else f"{s:7.1f}s"
+    for r in rows:
+        obj = "-" if r["objetivo"] is None else str(r["objetivo"])
+        print(f"  {r['nombre']:20s} {r['estado']:10s} {obj:>6s} "
+              f"{seg(r['solve_s'])} {seg(r['total_s'])}  {r['salida'] or '-'}")
+        if "error" in r:
+            print(f"      ❌ {r['error']}")
+        for err in r["reglas_invalidas"]:
+            print(f"      ⚠️  {err} (omitida)")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Resuelve escenarios del fixture en paralelo.")
+    ap.add_argument("escenarios", help="JSON con la lista de escenarios")
+    ap.add_argument("--parallel", type=int, default=None,
+                    help="escenarios simultáneos (default: núcleos disponibles)")
+    ap.add_argument("--out-dir", default=BATCH_DIR)
+    ap.add_argument("--equipos", default=EQUIPOS_JSON)
+    ap.add_argument("--reglas", default=REGLAS_JSON, metavar="JSON")
+    args = ap.parse_args(argv)
+
+    with open(args.escenarios, "r", encoding="utf-8") as fh:
+        escenarios = json.load(fh)["escenarios"]
+    try:
+        equipos_data = load_equipos(args.equipos)
+        reglas = load_reglas(args.reglas)
+    except FileNotFoundError as exc:
+        sys.exit(f"❌ No se encontró '{exc.filename}'.")
+    except ValueError as exc:
+        sys.exit(f"❌ {exc}")
+
+    try:
+        rows = run_batch(escenarios, equipos_data, args.parallel, args.out_dir, reglas)
+    except ValueError as exc:
+        sys.exit(f"❌ {exc}")
+    print_report(rows)
+
+    report = os.path.join(args.out_dir, "batch_report.json")
+    with open(report, "w", encoding="utf-8") as fh:
+        json.dump(rows, fh, indent=4, ensure_ascii=False)
+    print(f"\n📄 Reporte → {report}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+fixture_bench.py  ·  Benchmarks del modelo de fase 2
+=====================================================
+
+Compara los encodings de rachas de la sección 8 (STREAK_MODES) sobre los
+mismos datos y reporta, por encoding:
+
+  build_s           tiempo de FixtureEngine.build_model()
+  vars / cons       tamaño del modelo antes y después del presolve de CP-SAT
+  first_s           tiempo hasta la primera solución factible
+  optimal_s         tiempo hasta probar el óptimo (None si no se probó)
+
+Ligas sintéticas: synthetic_league() genera equipos.json + reglas con un
+RNG con semilla (competencias, equipos por división, densidad de
+cruces/co-locales y de canchas compartidas). NUM_FECHAS sale del round-robin
+doble (2·(n−1), o 2·n con n impar), así que se varía con equipos_div. Cada caso de una suite corre en
+un proceso nuevo (spawn) para medir además el pico de memoria (rss_mb), y
+los resultados se guardan como baseline para comparar corridas.
+
+Uso:
+  python fixture_bench.py --modes reified,clauses,automaton --scope competition
+  python fixture_bench.py --sinteticas media --guardar bench_baseline.json
+  python fixture_bench.py --sinteticas media --comparar bench_baseline.json
+"""
+
+import argparse, json, multiprocessing, random, re, resource, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+from ortools.sat.python import cp_model
+
+from fixture_generator import (COMP_DEFS, EQUIPOS_JSON, FEM_CATS, INF_CATS,
+                               STATUS_NAMES, STREAK_MODES, STREAK_SCOPES,
+                               FixtureEngine, build_competitions, load_equipos)
+from fixture_phase1 import canonical_schedule, legs, score_schedule
+from fixture_rules import validate_reglas
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MEDICIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+class _FirstSolution(cp_model.CpSolverSolutionCallback):
+    """Registra el WallTime de la primera solución factible."""
+
+    def __init__(self):
+        super().__init__()
+        self.first = None
+
+    def on_solution_callback(self):
+        if self.first is None:
+            self.first = self.WallTime()
+
+
+def _count(txt):
+    return int(txt.replace("'", ""))
+
+def parse_model_sizes(log_lines):
+    """
+    Extrae (#variables, #constraints) del log de CP-SAT para el modelo inicial
+    y el presolved. Retorna {"initial": (v, c), "presolved": (v, c)}; falta
+    "presolved" si el presolve cerró el problema.
+    """
+    sizes, current = {}, None
+    for line in "\n".join(log_lines).splitlines():
+        if line.startswith("Initial optimization model"):
+            current = "initial"
+        elif line.startswith("Presolved optimization model"):
+            current = "presolved"
+        elif current and line.startswith("#Variables:"):
+            sizes[current] = [_count(line.split()[1]), 0]
+        elif current and current in sizes and (m := re.match(r"#k\w+: ([\d']+)", line)):
+            sizes[current][1] += _count(m.group(1))
+        elif current and not line.strip():
+            current = None
+    return {k: tuple(v) for k, v in sizes.items()}
+
+def solve_instrumented(engine, max_time=60.0, workers=8):
+    """build_model() + Solve() midiendo tamaños y tiempos. Retorna una fila."""
+    t0 = time.perf_counter()
+    model = engine.build_model()
+    build_s = time.perf_counter() - t0
+
+    lines = []
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(max_time)
+    solver.parameters.num_search_workers  = workers
+    solver.parameters.log_search_progress = True
+    solver.parameters.log_to_stdout       = False
+    solver.log_callback = lines.append
+    cb = _FirstSolution()
+    status = solver.Solve(model, cb)
+
+    sizes = parse_model_sizes(lines)
+    ok = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        "estado":     STATUS_NAMES.get(status, str(status)),
+        "objetivo":   int(solver.ObjectiveValue()) if ok else None,
+        "build_s":    round(build_s, 3),
+        "vars":       sizes.get("initial", (None, None))[0],
+        "cons":       sizes.get("initial", (None, None))[1],
+        "pre_vars":   sizes.get("presolved", (None, None))[0],
+        "pre_cons":   sizes.get("presolved", (None, None))[1],
+        "first_s":    None if cb.first is None else round(cb.first, 3),
+        "optimal_s":  round(solver.WallTime(), 3) if status == cp_model.OPTIMAL else None,
+    }
+
+# ══════════════════════════════════════════════════════════════════════════════
+# RACHAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def bench_streaks(equipos_data, modes=STREAK_MODES, scope="competition",
+                  reglas=None, max_time=60.0, workers=8):
+    """
+    Una fila por encoding de rachas, todas sobre la misma fase 1 y reglas
+    (None = reglas.json).
+    """
+    rows = []
+    for mode in modes:
+        engine = FixtureEngine(equipos_data, reglas=reglas, verbose=False,
+                               streak_mode=mode, streak_scope=scope)
+        row = {"modo": mode, "scope": scope}
+        row.update(solve_instrumented(engine, max_time, workers))
+        rows.append(row)
+    return rows
+
+# ══════════════════════════════════════════════════════════════════════════════
+# LIGAS SINTÉTICAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+# Casos por suite: kwargs de synthetic_league() + "nombre" (+ "max_time").
+SUITES = {
+    "chica": [
+        {"nombre": "6x2",         "equipos_div": 6,  "divisiones": "AB"},
+        {"nombre": "6x3_fem",     "equipos_div": 6,  "divisiones": "ABC", "p_fem": 0.5},
+    ],
+    "media": [
+        {"nombre": "10x2",        "equipos_div": 10, "divisiones": "AB"},
+        {"nombre": "12x3",        "equipos_div": 12, "divisiones": "ABC"},
+        {"nombre": "12x3_denso",  "equipos_div": 12, "divisiones": "ABC",
+         "densidad": 0.9, "estadios": 6},
+        {"nombre": "15x3_30f",    "equipos_div": 15, "divisiones": "ABC"},
+    ],
+    "grande": [
+        {"nombre": "16x3",        "equipos_div": 16, "divisiones": "ABC"},
+        {"nombre": "20x3",        "equipos_div": 20, "divisiones": "ABC", "estadios": 8},
+        {"nombre": "24x2_fusion", "equipos_div": 24, "divisiones": "AB",
+         "densidad": 0.7, "estadios": 10, "max_time": 120},
+    ],
+}
+
+def synthetic_league(equipos_div=10, divisiones="ABC", competencias=None,
+                     p_fem=0.4, p_inf=0.5, densidad=0.5, estadios=2, factible=True, seed=0):
+    """
+    Liga con la forma de equipos.json. Por club: una entidad de primera
+    (divisiones A/B; en C los clubes solo tienen inferiores), inferiores
+    propias o en una entidad "Inferiores" aparte (co_local con la primera,
+    como en los datos reales) y, con probabilidad p_fem, un "Femenino" que
+    comparte cancha. `densidad` = probabilidad de regla primera–femenino;
+    `estadios` = pares de clubes de distinta división con cancha compartida
+    (y regla cross entre ellos). factible=True descarta las reglas que cierran
+    un ciclo de paridad sobre la agenda canónica (heurística de fase 1), así
+    el caso mide tiempos de resolución en vez de una infactibilidad.
+    Retorna (equipos, reglas, comp_defs, num_fechas), con num_fechas = las
+    que pide el round-robin de la competencia más grande.
+    """
+    rng = random.Random(seed)
+    cats_inf = {c: True for c in INF_CATS}
+    cats_fem = {c: True for c in FEM_CATS}
+    comp_defs = [d for d in COMP_DEFS if competencias is None or d[0] in competencias]
+    localidades = [f"Localidad {i}" for i in range(5)]
+
+    equipos, reglas, primeras = [], [], []
+    for div in divisiones:
+        for i in range(1, equipos_div + 1):
+            club = f"Club {div}{i:02d}"
+            base = {"localidad": rng.choice(localidades), "estadioPropio": True,
+                    "estadioLocal": f"Estadio {club}", "jerarquia": rng.randint(1, 3)}
+            ck_pri = f"PRIMERA_{div}"
+            tiene_pri = any(d[0] == ck_pri for d in COMP_DEFS)
+            if tiene_pri:
+                cats = {"primera": True}
+                if rng.random() >= p_inf:
+                    cats.update(cats_inf)
+                equipos.append({"nombre": club, "divisionMayor": div, "categorias": cats, **base})
+                primeras.append((ck_pri, club))
+            if not tiene_pri or "quinta" not in equipos[-1]["categorias"]:
+                inf = f"{club} Inferiores"
+                equipos.append({"nombre": inf, "divisionMayor": div, "clubPadre": club,
+                                "categorias": dict(cats_inf), **base})
+                if tiene_pri:
+                    reglas.append(("co_local", ck_pri, club, inf))
+            if tiene_pri and rng.random() < p_fem:
+                fem = f"{club} Femenino"
+                equipos.append({"nombre": fem, "divisionMayor": div, "clubPadre": club,
+                                "categorias": dict(cats_fem), **base})
+                if rng.random() < densidad:
+                    reglas.append(("cross", ck_pri, club, None, fem) if rng.random() < 0.7
+                                  else ("co_local", ck_pri, club, fem))
+
+    # Canchas compartidas entre clubes de primera de distinta división
+    por_div = {}
+    for ck, club in primeras:
+        por_div.setdefault(ck, []).append(club)
+    cks = sorted(por_div)
+    usados = set()
+    for _ in range(estadios if len(cks) >= 2 else 0):
+        ck_a, ck_b = rng.sample(cks, 2)
+        libres_a = [c for c in por_div[ck_a] if c not in usados]
+        libres_b = [c for c in por_div[ck_b] if c not in usados]
+        if not libres_a or not libres_b: break
+        a, b = rng.choice(libres_a), rng.choice(libres_b)
+        usados |= {a, b}
+        for e in equipos:
+            if b in (e["nombre"], e.get("clubPadre")):
+                e["estadioLocal"] = f"Estadio {a}"
+        reglas.append(("cross", ck_a, a, ck_b, b))
+
+    comps = build_competitions(equipos, comp_defs)
+    reglas = [r for r in reglas if not validate_reglas([r], comps)]
+    n = max(len(c["entities"]) for c in comps.values())
+    num_fechas = 2 * legs(n)
+    if factible:
+        sched, ok = canonical_schedule(comps), []
+        for r in reglas:
+            if score_schedule(comps, ok + [r], [], num_fechas, sched)[1]["paridad"] == 0:
+                ok.append(r)
+        reglas = ok
+    return equipos, reglas, comp_defs, num_fechas
+
+def _peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def run_case(case, mode="reified", scope="competition", workers=8, seed=0, max_time=60.0):
+    """
+    Un caso sintético (en su propio proceso). Retorna la fila del reporte.
+    El "max_time" del caso, si lo tiene, pisa el `max_time` general.
+    """
+    case = dict(case)
+    nombre, max_time = case.pop("nombre"), case.pop("max_time", max_time)
+    case.setdefault("seed", seed)
+    equipos, reglas, comp_defs, num_fechas = synthetic_league(**case)
+    engine = FixtureEngine(equipos, num_fechas=num_fechas, reglas=reglas,
+                           comp_defs=comp_defs, ayacucho=[], verbose=False,
+                           streak_mode=mode, streak_scope=scope)
+    row = {"caso": nombre, "modo": mode, "equipos": len(equipos), "reglas": len(reglas),
+           "fechas": num_fechas}
+    row.update(solve_instrumented(engine, max_time, workers))
+    row["partidos"] = len(engine.all_games)
+    row["rss_mb"] = _peak_rss_mb()
+    return row
+
+def bench_synthetic(cases, modes=("reified",), scope="competition", workers=8, seed=0,
+                    max_time=60.0):
+    """
+    Corre cada (caso, encoding) en un proceso nuevo (spawn): el RSS no se
+    arrastra.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    rows = []
+    for case in cases:
+        for mode in modes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                rows.append(pool.submit(run_case, case, mode, scope, workers, seed,
+                                        max_time).result())
+            print(f"   {rows[-1]['caso']:14s} {mode:10s} {rows[-1]['estado']}", flush=True)
+    return rows
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BASELINE
+# ══════════════════════════════════════════════════════════════════════════════
+
+METRICS = ("build_s", "first_s", "optimal_s", "vars", "cons", "rss_mb")
+
+def save_baseline(path, rows, meta):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"meta": meta, "filas": rows}, fh, indent=4, ensure_ascii=False)
+
+def compare_baseline(path, rows, tolerance=0.20, min_abs=0.05):
+    """
+    Compara contra un baseline guardado, por (caso, encoding). Una métrica es
+    regresión si empeora más de `tolerance` (relativo) y más de `min_abs`
+    (absoluto). Retorna [("caso/encoding", métrica, antes, ahora, ratio, regresión)].
+    """
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    modo = data.get("meta", {}).get("modo")         # baselines de un solo encoding
+    base = {(r["caso"], r.get("modo", modo)): r for r in data["filas"]}
+    out = []
+    for r in rows:
+        b = base.get((r["caso"], r["modo"]))
+        if b is None: continue
+        for m in METRICS:
+            antes, ahora = b.get(m), r.get(m)
+            if antes is None or ahora is None: continue
+            ratio = ahora / antes if antes else float("inf") if ahora else 1.0
+            out.append((f"{r['caso']}/{r['modo']}", m, antes, ahora, round(ratio, 2),
+                        ratio > 1 + tolerance and ahora - antes > min_abs))
+    return out
+
+def print_comparison(diffs):
+    print("\n=== COMPARACIÓN CON BASELINE ===")
+    for caso, m, antes, ahora, ratio, reg in diffs:
+        print(f"  {'❌' if reg else '  '} {caso:24s} {m:10s} {_fmt(antes):>10s} → "
+              f"{_fmt(ahora):>10s}  x{ratio}")
+
+def _fmt(v):
+    return "-" if v is None else str(v)
+
+def print_rows(rows, key, extra=()):
+    cols = [key, *extra, "estado", "objetivo", "build_s", "vars", "cons",
+            "pre_vars", "pre_cons", "first_s", "optimal_s"]
+    print("  " + " ".join(f"{c:>10s}" for c in cols))
+    for r in rows:
+        print("  " + " ".join(f"{_fmt(r[c]):>10s}" for c in cols))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de encodings de rachas.")
+    ap.add_argument("--modes", default=",".join(STREAK_MODES))
+    ap.add_argument("--scope", default="competition", choices=STREAK_SCOPES)
+    ap.add_argument("--max-time", type=float, default=60.0)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--sin-reglas", action="store_true",
+                    help="solo round-robin + rachas (sin cross/co_local)")
+    ap.add_argument("--equipos", default=EQUIPOS_JSON)
+    ap.add_argument("--sinteticas", choices=sorted(SUITES), metavar="SUITE",
+                    help=f"ligas sintéticas en vez de equipos.json ({', '.join(SUITES)})")
+    ap.add_argument("--semilla", type=int, default=0)
+    ap.add_argument("--guardar", metavar="JSON", help="guardar los resultados como baseline")
+    ap.add_argument("--comparar", metavar="JSON", help="comparar contra un baseline")
+    args = ap.parse_args(argv)
+
+    if args.sinteticas:
+        modes = args.modes.split(",")
+        print(f"=== LIGAS SINTÉTICAS · suite={args.sinteticas} · {','.join(modes)} · "
+              f"scope={args.scope} ===")
+        rows = bench_synthetic(SUITES[args.sinteticas], modes, args.scope,
+                               args.workers, args.semilla, args.max_time)
+        print_rows(rows, "caso", ("modo", "equipos", "reglas", "fechas", "rss_mb"))
+        if args.guardar:
+            save_baseline(args.guardar, rows, {"suite": args.sinteticas, "modos": modes,
+                                               "scope": args.scope, "workers": args.workers,
+                                               "semilla": args.semilla})
+            print(f"\n📄 Baseline → {args.guardar}")
+        if args.comparar:
+            diffs = compare_baseline(args.comparar, rows)
+            print_comparison(diffs)
+            if any(d[-1] for d in diffs):
+                sys.exit(1)
+        return rows
+
+    try:
+        equipos_data = load_equipos(args.equipos)
+    except FileNotFoundError:
+        sys.exit(f"❌ No se encontró '{args.equipos}'.")
+
+    modes = args.modes.split(",")
+    rows = bench_streaks(equipos_data, modes, args.scope,
+                         [] if args.sin_reglas else None,
+                         args.max_time, args.workers)
+    print(f"=== RACHAS · scope={args.scope} ===")
+    print_rows(rows, "modo")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+fixture_constraints.py  ·  Capa de emisión de restricciones
+============================================================
+
+Las reglas de localía (cross / co_local) no escriben directo en el CpModel:
+generan cláusulas sobre los literales local[p] y las acumulan acá.
+
+Literales como enteros:
+    p   →  local[p]        (equipo A del partido p es local)
+   ~p   →  local[p].Not()  (equipo B del partido p es local)
+
+Una restricción "x + y <= 1" entre dos literales es la cláusula (¬x ∨ ¬y),
+que se emite como AddBoolOr nativo. Cada cláusula se normaliza a un
+frozenset, así las reglas que se solapan (p.ej. dos reglas sobre San José
+Femenino en la misma fecha) emiten cada cláusula una sola vez, y las
+tautologías (x ∨ ¬x, típicas de un cruce entre rivales directos) no se
+emiten.
+"""
+
+from collections import Counter
+
+
+def to_cp(lit, local):
+    """Literal entero → literal CP-SAT sobre la lista de BoolVar `local`."""
+    return local[lit] if lit >= 0 else local[~lit].Not()
+
+
+class ConstraintBuilder:
+    """Acumula cláusulas por familia y las emite deduplicadas."""
+
+    def __init__(self):
+        self.clauses = {}          # frozenset(lits) -> familia (orden de inserción)
+        self.raw     = Counter()   # familia -> cláusulas generadas
+        self.emitted = Counter()   # familia -> cláusulas únicas a emitir
+
+    def add_clause(self, lits, family):
+        """Registra (l1 ∨ l2 ∨ ...). Ignora duplicados y tautologías."""
+        self.raw[family] += 1
+        key = frozenset(lits)
+        if key in self.clauses or any(~l in key for l in key):
+            return
+        self.clauses[key] = family
+        self.emitted[family] += 1
+
+    def at_most_one(self, a, b, family):
+        """a + b <= 1  ≡  (¬a ∨ ¬b)."""
+        self.add_clause((~a, ~b), family)
+
+    def emit(self, model, local):
+        """Escribe todas las cláusulas únicas en `model`."""
+        for key in self.clauses:
+            model.AddBoolOr([to_cp(l, local) for l in key])
+
+    def stats(self):
+        """{familia: (generadas, emitidas)}."""
+        return {f: (self.raw[f], self.emitted[f]) for f in self.raw}
+
+
+class ClauseRecorder:
+    """
+    Misma interfaz que ConstraintBuilder, pero solo anota las cláusulas en
+    orden (sin deduplicar): es el fragmento compilado de una regla, que se
+    cachea y después se reproduce con replay().
+    """
+
+    def __init__(self):
+        self.clauses = []
+
+    def add_clause(self, lits, family):
+        self.clauses.append(tuple(lits))
+
+    def at_most_one(self, a, b, family):
+        self.add_clause((~a, ~b), family)
+
+
+def replay(cb, clauses, family):
+    """Reproduce un fragmento (lista de cláusulas) sobre un ConstraintBuilder."""
+    for lits in clauses:
+        cb.add_clause(lits, family)
@@ -0,0 +1,181 @@
+"""
+fixture_decompose.py  ·  Fase 2 por componentes conexas
+=======================================================
+
+Dos variables del modelo están acopladas si aparecen en la misma
+restricción. Las componentes conexas de ese grafo son subproblemas
+independientes: cada una se resuelve como su propio CpModel (mismas
+restricciones, objetivo restringido a sus variables) en un pool de
+procesos, y los valores se combinan en una sola solución.
+
+El grafo se arma desde el CpModelProto ya emitido, así que cubre todas las
+familias (reglas, Ayacucho, rachas, hints del fixture previo) sin que cada
+una tenga que declarar sus variables.
+"""
+
+import os, tempfile, time
+from concurrent.futures import ProcessPoolExecutor
+
+from google.protobuf import text_format
+from ortools.sat import cp_model_pb2
+from ortools.sat.python import cp_model
+
+_REF_FIELDS = {"literals", "vars", "enforcement_literal"}
+
+
+def model_to_pb2(model):
+    """CpModel → CpModelProto de protobuf (el Proto() de CP-SAT no es un Message)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.pb")
+        model.ExportToFile(path)
+        with open(path, "rb") as fh:
+            return cp_model_pb2.CpModelProto.FromString(fh.read())
+
+
+def _refs(msg):
+    """Índices de variables referenciadas por un mensaje del proto (recursivo)."""
+    for fd, val in msg.ListFields():
+        vals = val if hasattr(val, "__len__") else (val,)   # repeated o singular
+        if fd.message_type is not None:
+            for sub in vals:
+                yield from _refs(sub)
+        elif fd.name in _REF_FIELDS:
+            for ref in vals:
+                yield ref if ref >= 0 else -ref - 1
+
+
+def model_components(proto):
+    """
+    Componentes conexas del grafo variable–restricción.
+    Retorna [(vars, constraints)] con listas de índices, de mayor a menor.
+    """
+    n = len(proto.variables)
+    parent = list(range(n))
+
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+
+    cons_vars = []
+    for ct in proto.constraints:
+        vs = sorted(set(_refs(ct)))
+        cons_vars.append(vs)
+        for v in vs[1:]:
+            ra, rb = find(vs[0]), find(v)
+            if ra != rb:
+                parent[rb] = ra
+
+    comps = {}
+    for v in range(n):
+        comps.setdefault(find(v), ([], []))[0].append(v)
+    for c, vs in enumerate(cons_vars):
+        if vs:
+            comps[find(vs[0])][1].append(c)
+    return sorted(comps.values(), key=lambda vc: (-len(vc[0]), vc[0][0]))
+
+
+def _remap(msg, idx):
+    """Reescribe in situ las referencias a variables de `msg` con idx[viejo] → nuevo."""
+    for fd, val in msg.ListFields():
+        if fd.message_type is not None:
+            for sub in (val if hasattr(val, "__len__") else (val,)):
+                _remap(sub, idx)
+        elif fd.name in _REF_FIELDS:
+            val[:] = [idx[r] if r >= 0 else -idx[-r - 1] - 1 for r in val]
+
+
+def sub_model(proto, variables, constraints):
+    """
+    Proto de una componente: solo sus variables (renumeradas 0..k-1 en el
+    orden de `variables`), sus restricciones y sus términos de objetivo y
+    hints. El trabajo es proporcional al tamaño de la componente.
+    """
+    idx = {v: i for i, v in enumerate(variables)}
+    sub = cp_model_pb2.CpModelProto()
+    sub.variables.extend(proto.variables[v] for v in variables)
+    for c in constraints:
+        ct = sub.constraints.add()
+        ct.CopyFrom(proto.constraints[c])
+        _remap(ct, idx)
+
+    if proto.HasField("objective"):
+        obj = proto.objective
+        for v, coeff in zip(obj.vars, obj.coeffs):
+            if (v if v >= 0 else -v - 1) in idx:
+                sub.objective.vars.append(idx[v] if v >= 0 else -idx[-v - 1] - 1)
+                sub.objective.coeffs.append(coeff)
+        sub.objective.offset = 0
+        if obj.scaling_factor:
+            sub.objective.scaling_factor = obj.scaling_factor
+
+    hint = proto.solution_hint
+    for v, val in zip(hint.vars, hint.values):
+        if v in idx:
+            sub.solution_hint.vars.append(idx[v])
+            sub.solution_hint.values.append(val)
+    return sub
+
+
+def _solve_component(item):
+    """Worker: resuelve una componente serializada. Retorna (status, obj, {var: val})."""
+    data, variables, max_time, workers = item
+    # El CpModelProto de CP-SAT (pybind) solo se carga desde texto; la
+    # conversión se hace acá, sobre la componente sola.
+    model = cp_model.CpModel()
+    model.Proto().parse_text_format(
+        text_format.MessageToString(cp_model_pb2.CpModelProto.FromString(data)))
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(max_time)
+    solver.parameters.num_search_workers  = workers
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return status, None, {}
+    solution = solver.ResponseProto().solution
+    return status, solver.ObjectiveValue(), {v: solution[i] for i, v in enumerate(variables)}
+
+
+def merge_status(statuses):
+    if any(s == cp_model.INFEASIBLE for s in statuses):
+        return cp_model.INFEASIBLE
+    if any(s == cp_model.MODEL_INVALID for s in statuses):
+        return cp_model.MODEL_INVALID
+    if any(s == cp_model.UNKNOWN for s in statuses):
+        return cp_model.UNKNOWN
+    if all(s == cp_model.OPTIMAL for s in statuses):
+        return cp_model.OPTIMAL
+    return cp_model.FEASIBLE
+
+
+def solve_components(model, max_time=300.0, parallel=None, log=print, workers=None):
+    """
+    Resuelve cada componente de `model` en un ProcessPoolExecutor.
+    `workers` = workers CP-SAT por componente, acotado a núcleos // parallel
+    (el batch ya reparte los núcleos entre escenarios y pasa su porción).
+    Retorna (status, objetivo, {var: valor}, wall_time, tamaños de componente).
+    """
+    t0 = time.perf_counter()
+    proto = model_to_pb2(model)
+    comps = model_components(proto)
+    cores    = os.cpu_count() or 1
+    parallel = max(1, min(parallel or cores, len(comps)))
+    workers  = max(1, min(workers or cores, cores // parallel))
+    sizes    = [len(vs) for vs, _ in comps]
+    log(f"   {len(comps)} componentes · mayor {sizes[0]} vars · "
+        f"{parallel} en paralelo · {workers} workers CP-SAT c/u")
+
+    items = [(sub_model(proto, vs, cs).SerializeToString(), vs, max_time, workers)
+             for vs, cs in comps]
+    if parallel == 1:
+        results = [_solve_component(it) for it in items]
+    else:
+        with ProcessPoolExecutor(max_workers=parallel) as pool:
+            results = list(pool.map(_solve_component, items))
+
+    status = merge_status([r[0] for r in results])
+    values, objective = {}, 0
+    for st, obj, vals in results:
+        values.update(vals)
+        objective += obj or 0
+    return status, objective, values, time.perf_counter() - t0, sizes
@@ -0,0 +1,270 @@
+"""
+fixture_export.py  ·  Export en una sola pasada
+================================================
+
+Un recorrido por los partidos resueltos escribe todas las salidas a la vez,
+así nunca quedan desfasadas entre sí:
+
+  fixture_output.json     lista de partidos (indent=4, como siempre)
+  fixture_output.ndjson   un partido por línea
+  fixture_output.csv      formato del visor: una fila por categoría que
+                          juegan ambos equipos ("INF A 5ª", "FEMENINO FEM
+                          SUB-14"; primera: "PRIMERA A")
+  <dir>/clubes/*.json     partidos de cada club (entidad o clubPadre)
+  <dir>/estadios/*.json   partidos de cada estadio
+  <dir>/fechas/*.json     shards del visor: filas del CSV de una
+                          (fecha, competencia), agrupadas por categoría
+  <dir>/index.json        competencias, fechas, conteos, archivos y el
+                          manifiesto de shards (el visor lo lee primero)
+
+JSON, NDJSON y CSV se escriben en streaming a archivos temporales y se
+publican con os.replace al terminar; las vistas por club/estadio y el índice
+se escriben después, con el índice último.
+
+El repo versiona fixture_output.json, su CSV y fixture_export/ (el visor
+servido desde el repo lee el índice y los shards); el NDJSON no. Para
+regenerar CSV y fixture_export/ desde un fixture JSON ya resuelto, sin
+volver a resolver:
+
+  python fixture_export.py [fixture_output.json]
+"""
+
+import argparse, csv, hashlib, io, json, os, re, sys, tempfile, unicodedata
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+
+CSV_FIELDS = ["competencia", "fecha", "local", "visitante"]
+
+# Etiqueta de cada categoría en el CSV del visor
+CAT_LABEL = {
+    "quinta": "5ª", "sexta": "6ª", "septima": "7ª", "octava": "8ª",
+    "novena": "9ª", "decima": "10ª", "undecima": "11ª",
+    "femenino_primera": "FEM PRIMERA", "femenino_sub16": "FEM SUB-16",
+    "femenino_sub14": "FEM SUB-14", "femenino_sub12": "FEM SUB-12",
+}
+
+# mkstemp crea 0600; las salidas se publican con el modo que daría open()
+_UMASK = os.umask(0); os.umask(_UMASK)
+
+
+@contextmanager
+def atomic_open(path):
+    """
+    open() de escritura que publica `path` con os.replace solo si no hubo
+    error. Conserva el modo de un `path` existente; si no, 0666 & ~umask.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as fh:
+            yield fh
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def write_atomic(path, text):
+    """Escribe `text` en `path` vía tmp + os.replace (mismo directorio)."""
+    with atomic_open(path) as fh:
+        fh.write(text)
+
+def slug(name):
+    """'SAN LORENZO (RAUCH)' → 'san-lorenzo-rauch' (nombre de archivo)."""
+    s = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", s.lower()).strip("-") or "sin-nombre"
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CATEGORÍAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def comp_label(ck):
+    return ck.replace("_", " ")
+
+def category_rows(equipos_data, comp_defs):
+    """
+    {ck: [(etiqueta, equipos con la categoría)]}. Competencias de una sola
+    categoría (primera) → una fila sin sufijo y sin filtro de equipos (None).
+    """
+    out = {}
+    for ck, cats, _div in comp_defs:
+        if len(cats) == 1:
+            out[ck] = [(comp_label(ck), None)]
+            continue
+        out[ck] = [(f"{comp_label(ck)} {CAT_LABEL.get(c, c)}",
+                    frozenset(e["nombre"] for e in equipos_data
+                              if e.get("categorias", {}).get(c, False) is True))
+                   for c in cats]
+    return out
+
+def _csv_rows(g, cats):
+    loc, vis = g["local"], g["visitante"]
+    for label, equipos in cats.get(g["competencia"], [(comp_label(g["competencia"]), None)]):
+        if equipos is None or (loc in equipos and vis in equipos):
+            yield (label, g["fecha"], loc, vis)
+
+def fixture_csv(fixture, cats=None):
+    """CSV del visor en memoria (borradores anytime). Sin `cats`: una fila por partido."""
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(CSV_FIELDS)
+    for g in fixture:
+        w.writerows(_csv_rows(g, cats or {}))
+    return buf.getvalue()
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EXPORT
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _json_item(g):
+    """Un partido con el mismo formato que json.dump(lista, indent=4)."""
+    return "    " + json.dumps(g, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+
+def export_fixture(fixture, equipos_data, comp_defs, json_path=None, csv_path=None,
+                   ndjson_path=None, out_dir=None):
+    """
+    Escribe las salidas pedidas recorriendo `fixture` una sola vez.
+    Retorna el índice (también en <out_dir>/index.json si hay out_dir).
+    """
+    cats = category_rows(equipos_data, comp_defs)
+    club_de    = {e["nombre"]: e.get("clubPadre") or e["nombre"] for e in equipos_data}
+    estadio_de = {e["nombre"]: e.get("estadioLocal") or "A confirmar" for e in equipos_data}
+
+    por_club, por_estadio = defaultdict(list), defaultdict(list)
+    por_shard = defaultdict(lambda: defaultdict(list))     # (fecha, ck) → etiqueta → filas
+    por_comp, por_fecha, filas_comp = Counter(), Counter(), Counter()
+    digest = hashlib.sha256()
+
+    with ExitStack() as stack:
+        fj = stack.enter_context(atomic_open(json_path)) if json_path else None
+        fn = stack.enter_context(atomic_open(ndjson_path)) if ndjson_path else None
+        fc = stack.enter_context(atomic_open(csv_path)) if csv_path else None
+        wc = csv.writer(fc, lineterminator="\n") if fc else None
+        if fj:
+            fj.write("[")
+        if wc:
+            wc.writerow(CSV_FIELDS)
+
+        for i, g in enumerate(fixture):
+            line = json.dumps(g, ensure_ascii=False)
+            digest.update(line.encode("utf-8"))
+            if fj:
+                fj.write(("\n" if i == 0 else ",\n") + _json_item(g))
+            if fn:
+                fn.write(line + "\n")
+            rows = list(_csv_rows(g, cats))
+            if wc:
+                wc.writerows(rows)
+
+            ck = g["competencia"]
+            shard = por_shard[(g["fecha"], ck)]
+            for label, _f, loc, vis in rows:
+                shard[label].append([loc, vis])
+            por_comp[ck] += 1
+            por_fecha[g["fecha"]] += 1
+            filas_comp[ck] += len(rows)
+            for club in dict.fromkeys((club_de.get(g["local"], g["local"]),
+                                       club_de.get(g["visitante"], g["visitante"]))):
+                por_club[club].append(g)
+            por_estadio[g.get("estadio") or estadio_de.get(g["local"], "A confirmar")].append(g)
+
+        if fj:
+            fj.write("\n]" if fixture else "]")
+
+    index = {
+        "partidos":   sum(por_comp.values()),
+        "filas_csv":  sum(filas_comp.values()),
+        "digest":     digest.hexdigest()[:16],
+        "competencias": {ck: {"etiqueta": comp_label(ck),
+                              "categorias": [label for label, _ in cats.get(ck, [])],
+                              "partidos": por_comp[ck], "filas_csv": filas_comp[ck]}
+                         for ck in sorted(por_comp)},
+        "fechas": {str(f): por_fecha[f] for f in sorted(por_fecha)},
+        "archivos": {k: os.path.relpath(p, out_dir or os.path.dirname(os.path.abspath(p)))
+                     for k, p in (("json", json_path), ("csv", csv_path),
+                                  ("ndjson", ndjson_path)) if p},
+    }
+    if out_dir is None:
+        return index
+
+    os.makedirs(out_dir, exist_ok=True)
+    index["clubes"]   = _write_views(out_dir, "clubes", por_club)
+    index["estadios"] = _write_views(out_dir, "estadios", por_estadio)
+    orden = {label: i for filas in cats.values() for i, (label, _) in enumerate(filas)}
+    index["shards"]   = _write_shards(out_dir, por_shard, orden)
+    write_atomic(os.path.join(out_dir, "index.json"),
+                 json.dumps(index, indent=4, ensure_ascii=False))
+    return index
+
+def _prune(folder, vigentes):
+    """Borra los .json de una corrida anterior que ya no corresponden."""
+    for fn in os.listdir(folder):
+        if fn.endswith(".json") and fn not in vigentes:
+            os.unlink(os.path.join(folder, fn))
+
+def _write_views(out_dir, kind, groups):
+    """Un JSON por grupo en <out_dir>/<kind>/; retorna {nombre: {archivo, partidos}}."""
+    folder = os.path.join(out_dir, kind)
+    os.makedirs(folder, exist_ok=True)
+    out, usados = {}, Counter()
+    for name in sorted(groups):
+        s = slug(name)
+        usados[s] += 1
+        if usados[s] > 1:                       # dos nombres con el mismo slug
+            s = f"{s}-{usados[s]}"
+        rel = f"{kind}/{s}.json"
+        write_atomic(os.path.join(out_dir, rel),
+                     json.dumps(groups[name], indent=4, ensure_ascii=False))
+        out[name] = {"archivo": rel, "partidos": len(groups[name])}
+    _prune(folder, {os.path.basename(v["archivo"]) for v in out.values()})
+    return out
+
+def _write_shards(out_dir, por_shard, orden):
+    """
+    Un JSON compacto por (fecha, competencia) en <out_dir>/fechas/.
+    Retorna el manifiesto {fecha: {ck: {archivo, filas: {etiqueta: n}}}}.
+    """
+    folder = os.path.join(out_dir, "fechas")
+    os.makedirs(folder, exist_ok=True)
+    manifest = defaultdict(dict)
+    for (fecha, ck), filas in sorted(por_shard.items()):
+        filas = dict(sorted(filas.items(), key=lambda kv: orden.get(kv[0], len(orden))))
+        rel = f"fechas/{fecha:02d}-{slug(ck)}.json"
+        write_atomic(os.path.join(out_dir, rel),
+                     json.dumps({"fecha": fecha, "competencia": ck, "filas": filas},
+                                ensure_ascii=False, separators=(",", ":")))
+        manifest[str(fecha)][ck] = {"archivo": rel,
+                                    "filas": {label: len(v) for label, v in filas.items()}}
+    _prune(folder, {os.path.basename(v["archivo"])
+                    for cks in manifest.values() for v in cks.values()})
+    return dict(manifest)
+
+def main(argv=None):
+    from fixture_generator import (COMP_DEFS, EQUIPOS_JSON, EXPORT_DIR, OUTPUT_CSV,
+                                   OUTPUT_JSON, load_equipos, load_fixture)
+    ap = argparse.ArgumentParser(description="Regenera el CSV y el export del visor "
+                                             "desde un fixture JSON.")
+    ap.add_argument("fixture", nargs="?", default=OUTPUT_JSON)
+    ap.add_argument("--equipos", default=EQUIPOS_JSON)
+    ap.add_argument("--csv", default=OUTPUT_CSV)
+    ap.add_argument("--out-dir", default=EXPORT_DIR)
+    args = ap.parse_args(argv)
+
+    try:
+        fixture = load_fixture(args.fixture)
+        equipos_data = load_equipos(args.equipos)
+    except FileNotFoundError as exc:
+        sys.exit(f"❌ No se encontró '{exc.filename}'.")
+    index = export_fixture(fixture, equipos_data, COMP_DEFS, csv_path=args.csv,
+                           out_dir=args.out_dir)
+    print(f"💾 {index['partidos']} partidos · {index['filas_csv']} filas → "
+          f"{args.csv} · {args.out_dir}/")
+    return index
+
+
+if __name__ == "__main__":
+    main()
@@ -21,26 +21,57 @@ FASE 2 (CP-SAT, solo 706 variables):
     local[p] = 0  →  equipo B es local
   El solver solo necesita satisfacer las restricciones de cruce/co-local
   sobre estos 706 bits binarios. El modelo es 26x más pequeño.
+
+USO COMO MÓDULO
+----------------
+  engine = FixtureEngine.from_json("equipos.json")
+  result = engine.solve(max_time=300)
+  if result.ok:
+      engine.export(result, "fixture_output.json")          # + csv/ndjson/vistas opcionales
+
+El motor no tiene estado global: cada FixtureEngine guarda sus datos y los
+índices de fase 1, y cada solve() construye un modelo CP-SAT nuevo sobre
+ellos. Se pueden tener varias temporadas o escenarios en el mismo proceso.
 """
 
-import json, os, sys
-from itertools import combinations
+import argparse, json, os, sys
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 from ortools.sat.python import cp_model
 
+from fixture_anytime import AnytimeCallback
+from fixture_constraints import ClauseRecorder, ConstraintBuilder, replay, to_cp
+from fixture_decompose import solve_components
+from fixture_export import category_rows, export_fixture
+from fixture_phase1 import build_games, legs, search_schedules
+from fixture_phase3 import assign_slots
+from fixture_rules import TIPOS, RuleCache, load_reglas, phase1_key, split_reglas
+from fixture_store import GameStore
+from fixture_telemetry import ProgressCallback, Telemetry
+from fixture_travel import (DISTANCIAS_JSON, KM_LARGO, KM_UNIDAD, game_distances,
+                            load_distancias, team_localities, travel_by_team)
+
 # ══════════════════════════════════════════════════════════════════════════════
 # 1. DATOS
 # ══════════════════════════════════════════════════════════════════════════════
 SCRIPT_DIR   = os.path.dirname(os.path.abspath(__file__))
 EQUIPOS_JSON = os.path.join(SCRIPT_DIR, "equipos.json")
+OUTPUT_JSON  = os.path.join(SCRIPT_DIR, "fixture_output.json")
+OUTPUT_CSV   = os.path.join(SCRIPT_DIR, "fixture_output.csv")
+OUTPUT_NDJSON = os.path.join(SCRIPT_DIR, "fixture_output.ndjson")
+EXPORT_DIR   = os.path.join(SCRIPT_DIR, "fixture_export")       # vistas + index.json
+TELEMETRY_JSONL = os.path.join(SCRIPT_DIR, "fixture_telemetry.jsonl")
+SUMMARY_JSON    = os.path.join(SCRIPT_DIR, "fixture_summary.json")
 
-try:
-    with open(EQUIPOS_JSON, "r", encoding="utf-8") as fh:
-        data = json.load(fh)
-except FileNotFoundError:
-    sys.exit(f"❌ No se encontró '{EQUIPOS_JSON}'.")
+def load_equipos(path=EQUIPOS_JSON):
+    """Lee equipos.json y retorna la lista de equipos."""
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)["equipos"]
 
-equipos_data = data["equipos"]
-estadio_de   = {e["nombre"]: e.get("estadioLocal", "A confirmar") for e in equipos_data}
+def load_fixture(path=OUTPUT_JSON):
+    """Lee un fixture_output.json previo (lista de partidos)."""
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
 
 def tiene_cat(e, cat):
     return e.get("categorias", {}).get(cat, False) is True
@@ -60,438 +91,1184 @@ COMP_DEFS = [
     ("FEMENINO",  FEM_CATS,    None),
 ]
 
-COMPETITIONS = {}
-for ck, cats, div in COMP_DEFS:
-    parts = sorted({
-        e["nombre"] for e in equipos_data
-        if any(tiene_cat(e, c) for c in cats)
-        and (div is None or e.get("divisionMayor") == div)
-    })
-    if len(parts) >= 2:
-        COMPETITIONS[ck] = {"entities": parts}
-
 NUM_FECHAS = 26
-all_entities = sorted({n for c in COMPETITIONS.values() for n in c["entities"]})
 
-print("=== COMPETENCIAS ===")
-for ck, comp in COMPETITIONS.items():
-    n = len(comp["entities"])
-    print(f"  {ck:12s}: {n:2d} equipos · {n-1:2d} locales/equipo · {(n-1)*2:2d} rondas")
+# Equidad por competencia (ver FixtureEngine._add_equity): {ck: opciones}.
+# Vacío = sin equidad. Opciones (faltantes → EQUIDAD_DEFAULT):
+#   rachas           si un equipo tiene una racha de 3, todos tienen alguna
+#   spread_rachas    máx − mín de rachas de 3 entre equipos (None = libre)
+#   spread_localias  máx − mín de localías por equipo en cada vuelta
+EQUIDAD_DEFAULT = {"rachas": True, "spread_rachas": None, "spread_localias": 1}
+
+def build_competitions(equipos_data, comp_defs=COMP_DEFS):
+    """Retorna {ck: {"entities": [...]}} con las competencias de ≥ 2 equipos."""
+    competitions = {}
+    for ck, cats, div in comp_defs:
+        parts = sorted({
+            e["nombre"] for e in equipos_data
+            if any(tiene_cat(e, c) for c in cats)
+            and (div is None or e.get("divisionMayor") == div)
+        })
+        if len(parts) >= 2:
+            competitions[ck] = {"entities": parts}
+    return competitions
 
 # ══════════════════════════════════════════════════════════════════════════════
-# 3. FASE 1 — ASIGNACIÓN DE FECHAS (round-robin canónico)
+# 3. FASE 1 — ASIGNACIÓN DE FECHAS (round-robin, ver fixture_phase1)
 # ══════════════════════════════════════════════════════════════════════════════
-
-def round_robin_rounds(teams):
-    """Algoritmo de rotación. Retorna lista de rondas [(t1,t2), ...]."""
-    t = list(teams)
-    if len(t) % 2 == 1:
-        t.append("BYE")
-    n = len(t)
-    fixed, rotating = t[0], t[1:]
-    rounds = []
-    for _ in range(n - 1):
-        circle = [fixed] + rotating
-        pairs = [(circle[i], circle[n-1-i])
-                 for i in range(n//2)
-                 if circle[i] != "BYE" and circle[n-1-i] != "BYE"]
-        rounds.append(pairs)
-        rotating = [rotating[-1]] + rotating[:-1]
-    return rounds
-
-# Generar todos los partidos con fecha asignada
-# all_games[p] = (fecha, ck, A, B)  — solver decide si A o B es local
-all_games = []
-
-for ck, comp in COMPETITIONS.items():
-    rounds = round_robin_rounds(comp["entities"])
-    nr = len(rounds)
-    # Vuelta 1: fechas 1..nr
-    for r, ronda in enumerate(rounds):
-        for t1, t2 in ronda:
-            all_games.append((r + 1, ck, t1, t2))
-    # Vuelta 2: fechas nr+1..2*nr
-    for r, ronda in enumerate(rounds):
-        for t1, t2 in ronda:
-            all_games.append((nr + r + 1, ck, t1, t2))
-
-P = len(all_games)
-print(f"\nFase 1 completada: {P} partidos con fechas fijas")
-
-# Índices de partidos por (fecha, equipo) para lookup rápido
-from collections import defaultdict
-games_by_date_team = defaultdict(list)  # (fecha, equipo) -> [idx_partido]
-games_by_date_comp = defaultdict(list)  # (fecha, ck) -> [idx_partido]
-
-for idx, (fecha, ck, A, B) in enumerate(all_games):
-    games_by_date_team[(fecha, A)].append(idx)
-    games_by_date_team[(fecha, B)].append(idx)
-    games_by_date_comp[(fecha, ck)].append(idx)
+# round_robin_rounds() + agenda por competencia (orden, rotación, espejo).
+# Sin agenda explícita se usa la canónica: orden alfabético, vuelta 2 = vuelta 1.
 
 # ══════════════════════════════════════════════════════════════════════════════
-# 4. FASE 2 — MODELO CP-SAT: solo localía
+# 6. REGLAS DE LOCALÍA
 # ══════════════════════════════════════════════════════════════════════════════
-model = cp_model.CpModel()
-
-# local[p] = 1 → all_games[p][2] (equipo A) es local
-# local[p] = 0 → all_games[p][3] (equipo B) es local
-local = [model.NewBoolVar(f"loc_{p}") for p in range(P)]
-
-def is_local(p, team):
-    """Expresión lineal: 1 si team es local en partido p."""
-    _, _, A, B = all_games[p]
-    if team == A: return local[p]
-    if team == B: return local[p].Not()
-    raise ValueError(f"{team} no juega en partido {p}")
-
-def is_visitor(p, team):
-    _, _, A, B = all_games[p]
-    if team == A: return local[p].Not()
-    if team == B: return local[p]
-    raise ValueError(f"{team} no juega en partido {p}")
-
-def home_vars(fecha, ck, team):
-    """Lista de vars 'team es local' en (fecha, ck)."""
-    return [is_local(p, team)
-            for p in games_by_date_comp[(fecha, ck)]
-            if all_games[p][2] == team or all_games[p][3] == team]
-
-def away_vars(fecha, ck, team):
-    return [is_visitor(p, team)
-            for p in games_by_date_comp[(fecha, ck)]
-            if all_games[p][2] == team or all_games[p][3] == team]
-
-def home_vars_global(fecha, team):
-    """Lista de vars 'team es local' en cualquier comp en fecha dada."""
-    return [is_local(p, team) for p in games_by_date_team[(fecha, team)]]
-
-def away_vars_global(fecha, team):
-    return [is_visitor(p, team) for p in games_by_date_team[(fecha, team)]]
-
-# ── Restricción base: no puede ser local Y visitante el mismo día ─────────────
-# (Ya está implícito porque cada equipo juega máx 1 partido/fecha/comp,
-#  pero un equipo en 2 comps podría jugar 2 partidos el mismo día en comps distintas.
-#  Eso está OK, pero no puede ser local en una y visitante en la otra si hay
-#  restricción de co_local. La base es: un equipo puede tener max 1 partido/fecha
-#  POR COMPETENCIA. Entre competencias distintas pueden coincidir.)
-
-# ── Rachas: helper ────────────────────────────────────────────────────────────
-# Para rachas necesitamos saber si el equipo tiene partido en esa fecha
-def has_game(fecha, team):
-    return len(games_by_date_team[(fecha, team)]) > 0
+# Las reglas viven en reglas.json (ver fixture_rules). Cada regla es la tupla
+# (helper, *args) con la misma firma que FixtureEngine.cross /
+# FixtureEngine.co_local. El orden importa: es el orden de emisión al modelo.
+# Se leen al crear el motor (reglas=None), no al importar este módulo.
+REGLAS_JSON = os.path.join(SCRIPT_DIR, "reglas.json")
+
+# Fragmentos compilados de reglas (ver fixture_rules.RuleCache)
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".fixture_cache")
+
+# Sección 7: clubes de Ayacucho con tope de 2 locales simultáneos
+AYACUCHO = ["DEFENSORES DE AYACUCHO","ATLETICO AYACUCHO",
+            "SARMIENTO (AYACUCHO)","ATENEO ESTRADA"]
+
+# Verificación post-solve femenino/masculino
+CHECKS = [
+    ("cross", "Independiente",       "Independiente Femenino"),
+    ("cross", "Ferrocarril Sud",      "Ferrocarril Sud Femenino"),
+    ("cross", "Excursionistas",       "Excursionistas Femenino"),
+    ("cross", "Gimnasia y Esgrima",   "Gimnasia y Esgrima Femenino"),
+    ("cross", "Santamarina",          "Santamarina Femenino"),
+    ("cross", "Juarense",             "Juarense Femenino"),
+    ("cross", "ATLETICO AYACUCHO",    "ATLETICO AYACUCHO Femenino"),
+    ("coloc", "Loma Negra",           "Loma Negra Femenino"),
+    ("coloc", "SAN LORENZO (RAUCH)",  "SAN LORENZO (RAUCH) Femenino"),
+]
+
+# Sección 8: encodings de rachas (ver FixtureEngine._add_streaks)
+STREAK_MODES  = ("reified", "clauses", "automaton")
+STREAK_SCOPES = ("global", "competition")
+
+# (estado, valor, siguiente): valor 0 libre, 1 local, 2 visitante
+STREAK_AUTOMATON = (
+    [(s, 0, 0) for s in range(7)] +
+    [(s, 1, 1) for s in (0, 4, 5, 6)] + [(1, 1, 2), (2, 1, 3)] +
+    [(s, 2, 4) for s in (0, 1, 2, 3)] + [(4, 2, 5), (5, 2, 6)]
+)
+
+STATUS_TXT = {
+    cp_model.OPTIMAL:    "✅ ÓPTIMO",
+    cp_model.FEASIBLE:   "⚡ FACTIBLE (tiempo agotado antes del óptimo)",
+    cp_model.INFEASIBLE: "❌ INFACTIBLE",
+    cp_model.UNKNOWN:    "❓ DESCONOCIDO",
+}
+STATUS_NAMES = {
+    cp_model.OPTIMAL:       "OPTIMAL",
+    cp_model.FEASIBLE:      "FEASIBLE",
+    cp_model.INFEASIBLE:    "INFEASIBLE",
+    cp_model.UNKNOWN:       "UNKNOWN",
+    cp_model.MODEL_INVALID: "MODEL_INVALID",
+}
 
 # ══════════════════════════════════════════════════════════════════════════════
-# 5. RESTRICCIONES DE LOCALÍA
+# MOTOR
 # ══════════════════════════════════════════════════════════════════════════════
 
-# ── Helpers para restricciones cruzadas ──────────────────────────────────────
+@dataclass
+class FixtureResult:
+    """Resultado de un solve(): estado CP-SAT, penalización y fixture."""
+    status: int
+    objective: int = None
+    wall_time: float = 0.0
+    fixture: list = field(default_factory=list)
+    flips: int = None       # inversiones de localía vs. el fixture previo
+    travel: int = None      # desvío de viaje (unidades de KM_UNIDAD), si se optimiza
 
-def co_local(ck_A, A, B):
-    """
-    Cuando A es local en ck_A → B no puede ser visitante (en ninguna comp).
-    Bidireccional: B local (global) → A no puede ser visitante en ck_A.
-    
-    Formulación directa sin vars auxiliares:
-      sum(home_vars(ck_A,A)) + sum(away_vars_global(B)) <= 1
-      sum(home_vars_global(B)) + sum(away_vars(ck_A,A)) <= 1
-    
-    Nota: estos términos son al máximo 1 cada uno (un equipo juega max
-    1 partido/fecha/comp), así que la constraint es entre dos vars 0/1.
-    """
-    if A not in all_entities or B not in all_entities: return
-    if A not in COMPETITIONS.get(ck_A,{}).get("entities",[]): return
-
-    for fecha in range(1, NUM_FECHAS+1):
-        hA = home_vars(fecha, ck_A, A)
-        vA = away_vars(fecha, ck_A, A)
-        hB = home_vars_global(fecha, B)
-        vB = away_vars_global(fecha, B)
-
-        # Si no hay partidos ese día, no hay restricción
-        if not hA and not vA: continue
-
-        # Si A y B se enfrentan directamente ese día → H2H bypass
-        is_h2h = any(
-            (all_games[p][2] in (A,B) and all_games[p][3] in (A,B))
-            for p in games_by_date_team[(fecha, A)]
-            if p in games_by_date_team[(fecha, B)]
-               # más estricto: mismo partido
-        )
-        # Verificación correcta de H2H
-        h2h_idx = [p for p in games_by_date_team[(fecha, A)]
-                   if p in games_by_date_team[(fecha, B)]
-                   and {all_games[p][2], all_games[p][3]} == {A, B}]
-        
-        if h2h_idx:
-            # Solo hay un partido directo. En ese partido no aplicamos co_local.
-            # Aplicamos co_local solo en partidos de ck_A donde A NO juega vs B.
-            hA_no_h2h = [v for p, v in zip(
-                [pp for pp in games_by_date_comp[(fecha, ck_A)]
-                 if all_games[pp][2]==A or all_games[pp][3]==A],
-                hA) if p not in h2h_idx]
-            # Simplificación: si el partido de A en ck_A ES el H2H, no hay restricción
-            # Si el partido de A en ck_A NO es el H2H, aplicar normalmente
-            for v_hA in hA_no_h2h:
-                for v_vB in vB:
-                    model.Add(v_hA + v_vB <= 1)
-            vA_no_h2h = [v for p, v in zip(
-                [pp for pp in games_by_date_comp[(fecha, ck_A)]
-                 if all_games[pp][2]==A or all_games[pp][3]==A],
-                vA) if p not in h2h_idx]
-            for v_vA in vA_no_h2h:
-                for v_hB in hB:
-                    model.Add(v_vA + v_hB <= 1)
-        else:
-            for v_hA in hA:
-                for v_vB in vB:
-                    model.Add(v_hA + v_vB <= 1)
-            for v_vA in vA:
-                for v_hB in hB:
-                    model.Add(v_vA + v_hB <= 1)
-
-
-def cross(ck_A, A, ck_B_or_None, B):
+    @property
+    def ok(self):
+        return self.status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+    @property
+    def status_name(self):
+        return STATUS_NAMES.get(self.status, str(self.status))
+
+
+class FixtureEngine:
     """
-    Cruce: A y B siempre con condiciones OPUESTAS en sus torneos.
-    A local en ck_A → B no local en ck_B (o global si ck_B=None).
-    A visit en ck_A → B no visit.
+    Motor reutilizable: datos → fase 1 → modelo fase 2 → solve → export.
+
+    Los datos parseados y los índices de fase 1 se calculan una sola vez y se
+    reutilizan en cada build_model()/solve().
     """
-    if A not in all_entities or B not in all_entities: return
-    if A not in COMPETITIONS.get(ck_A,{}).get("entities",[]): return
-
-    for fecha in range(1, NUM_FECHAS+1):
-        hA = home_vars(fecha, ck_A, A)
-        vA = away_vars(fecha, ck_A, A)
-        if ck_B_or_None and B in COMPETITIONS.get(ck_B_or_None,{}).get("entities",[]):
-            hB = home_vars(fecha, ck_B_or_None, B)
-            vB = away_vars(fecha, ck_B_or_None, B)
-        else:
-            hB = home_vars_global(fecha, B)
-            vB = away_vars_global(fecha, B)
-
-        for v_hA in hA:
-            for v_hB in hB:
-                model.Add(v_hA + v_hB <= 1)
-        for v_vA in vA:
-            for v_vB in vB:
-                model.Add(v_vA + v_vB <= 1)
 
-# ══════════════════════════════════════════════════════════════════════════════
-# 6. APLICAR REGLAS
-# ══════════════════════════════════════════════════════════════════════════════
-print("\nAplicando restricciones de localía...")
-
-# ── Independiente (azul, A) ────────────────────────────────────────────────────
-cross("PRIMERA_A", "Independiente",       None,       "Independiente Femenino")
-# ── Independiente Rojo (INF_B) ────────────────────────────────────────────────
-cross("INF_B",     "Independiente (rojo)", "PRIMERA_A","Independiente")
-# Rojo y Femenino van JUNTOS: cuando Azul es visitante, ambos son locales
-co_local("INF_B",  "Independiente (rojo)", "Independiente Femenino")
-# ── BOTAFOGO ──────────────────────────────────────────────────────────────────
-co_local("PRIMERA_B", "BOTAFOGO F.C.",    "BOTAFOGO F.C. Inferiores")
-# ── Ferrocarril Sud (A) ───────────────────────────────────────────────────────
-cross("PRIMERA_A", "Ferrocarril Sud",     None,       "Ferrocarril Sud Femenino")
-# ── Ferro Azul (INF_B) ────────────────────────────────────────────────────────
-cross("INF_B",     "Ferro Azul",          "PRIMERA_A","Ferrocarril Sud")
-# Azul y Femenino van JUNTOS: cuando Sud es visitante, ambos son locales
-co_local("INF_B",  "Ferro Azul",           "Ferrocarril Sud Femenino")
-# ── Defensores Ayacucho ───────────────────────────────────────────────────────
-co_local("PRIMERA_A", "DEFENSORES DE AYACUCHO", "DEFENSORES DE AYACUCHO Inferiores")
-# ── Velense ───────────────────────────────────────────────────────────────────
-co_local("PRIMERA_A", "Velense",          "Velense Inferiores")
-# ── Argentino ─────────────────────────────────────────────────────────────────
-co_local("PRIMERA_B", "Argentino",        "Argentino Inferiores")
-# ── San José ──────────────────────────────────────────────────────────────────
-co_local("PRIMERA_B", "San José",         "San José Inferiores")
-# San José siempre opuesto a Excursionistas masculino
-cross("PRIMERA_B",    "San José",         "PRIMERA_B","Excursionistas")
-# NO cross directo San José-ExcFem: triángulo imposible con Exc-ExcFem (same)
-# La relación es transitiva: SJ cross Exc + Exc co_local ExcFem => SJ opp ExcFem
-# ── Excursionistas ────────────────────────────────────────────────────────────
-# Exc y ExcFem van JUNTOS (cuando SJ es local, Exc+ExcFem son visitantes)
-co_local("PRIMERA_B", "Excursionistas",   "Excursionistas Femenino")
-# ── Alumni ────────────────────────────────────────────────────────────────────
-co_local("PRIMERA_B", "Alumni",           "Alumni Inferiores")
-cross("PRIMERA_B",    "Alumni",           "PRIMERA_A","Juarense")
-# ── Deportivo Tandil ──────────────────────────────────────────────────────────
-co_local("PRIMERA_A", "Deportivo Tandil", "Deportivo Tandil Inferiores")
-cross("PRIMERA_A",    "Deportivo Tandil", None,       "Juventud Unida Fem (Blanco)")
-cross("PRIMERA_A",    "Deportivo Tandil", "PRIMERA_B","Defensores del Cerro")
-# ── Defensores del Cerro ──────────────────────────────────────────────────────
-co_local("PRIMERA_B", "Defensores del Cerro", "Defensores del Cerro Inferiores")
-co_local("PRIMERA_B", "Defensores del Cerro", "Juventud Unida Fem (Blanco)")
-# ── Loma Negra — EXCEPCIÓN: femenino co-local ─────────────────────────────────
-co_local("PRIMERA_B", "Loma Negra",       "Loma Negra Inferiores")
-co_local("PRIMERA_B", "Loma Negra",       "Loma Negra Femenino")
-# ── Juarense ──────────────────────────────────────────────────────────────────
-cross("PRIMERA_A",    "Juarense",         None,       "Juarense Femenino")
-# ── UNICEN ────────────────────────────────────────────────────────────────────
-cross("PRIMERA_A",    "UNICEN",           "PRIMERA_B","Grupo Universitario")
-# ── Atlético Ayacucho ─────────────────────────────────────────────────────────
-co_local("PRIMERA_A", "ATLETICO AYACUCHO","ATLETICO AYACUCHO Inferiores")
-cross("PRIMERA_A",    "ATLETICO AYACUCHO",None,       "ATLETICO AYACUCHO Femenino")
-# ── Sarmiento Ayacucho ────────────────────────────────────────────────────────
-co_local("PRIMERA_A", "SARMIENTO (AYACUCHO)", "SARMIENTO (AYACUCHO) Inferiores")
-cross("PRIMERA_A",    "SARMIENTO (AYACUCHO)","PRIMERA_B","ATENEO ESTRADA")
-# ── Ateneo Estrada ────────────────────────────────────────────────────────────
-co_local("PRIMERA_B", "ATENEO ESTRADA",   "ATENEO ESTRADA Inferiores")
-# ── Deportivo Rauch ───────────────────────────────────────────────────────────
-co_local("PRIMERA_B", "DEPORTIVO RAUCH",  "DEPORTIVO RAUCH Inferiores")
-# ── Santamarina ───────────────────────────────────────────────────────────────
-cross("PRIMERA_A",    "Santamarina",      None,       "Santamarina Femenino")
-cross("PRIMERA_A",    "Santamarina",      "PRIMERA_B","Oficina")
-# ── Gimnasia ──────────────────────────────────────────────────────────────────
-cross("PRIMERA_A",    "Gimnasia y Esgrima",None,      "Gimnasia y Esgrima Femenino")
-# ── Oficina ───────────────────────────────────────────────────────────────────
-co_local("PRIMERA_B", "Oficina",          "Santamarina Femenino")
-# ── Juventud Unida ────────────────────────────────────────────────────────────
-co_local("PRIMERA_A", "Juventud Unida",   "Juventud Unida Infantiles")
-cross("PRIMERA_A",    "Juventud Unida",   "PRIMERA_B","Unión y Progreso")
-co_local("PRIMERA_A", "Juventud Unida",   "San José Femenino")
-co_local("PRIMERA_A", "Juventud Unida",   "Juventud Unida Fem (Negro)")
-# ── Unión y Progreso ──────────────────────────────────────────────────────────
-cross("PRIMERA_B",    "Unión y Progreso", None,       "San José Femenino")
-cross("PRIMERA_B",    "Unión y Progreso", None,       "Juventud Unida Fem (Negro)")
-# ── San Lorenzo Rauch — femenino co-local (sub16, sin conflicto de cancha) ────
-co_local("PRIMERA_B", "SAN LORENZO (RAUCH)", "SAN LORENZO (RAUCH) Inferiores")
-co_local("PRIMERA_B", "SAN LORENZO (RAUCH)", "SAN LORENZO (RAUCH) Femenino")
+    def __init__(self, equipos_data, num_fechas=NUM_FECHAS, reglas=None,
+                 comp_defs=COMP_DEFS, ayacucho=AYACUCHO, verbose=True,
+                 streak_mode="reified", streak_scope="global", schedule=None,
+                 cache_dir=None, telemetry=None, travel_weight=0, max_long_trips=None,
+                 long_km=KM_LARGO, distancias=DISTANCIAS_JSON, equity=None):
+        if streak_mode not in STREAK_MODES:
+            raise ValueError(f"streak_mode debe ser uno de {STREAK_MODES}")
+        if streak_scope not in STREAK_SCOPES:
+            raise ValueError(f"streak_scope debe ser uno de {STREAK_SCOPES}")
+        self.equipos_data = equipos_data
+        self.streak_mode  = streak_mode
+        self.streak_scope = streak_scope
+        self.num_fechas   = num_fechas
+        self.reglas       = list(load_reglas(REGLAS_JSON) if reglas is None else reglas)
+        self.ayacucho_def = list(ayacucho)
+        self.verbose      = verbose
+        self.travel_weight  = travel_weight
+        self.max_long_trips = max_long_trips
+        self.long_km        = long_km
+        self.distancias     = distancias
+        self.equity = {ck: {**EQUIDAD_DEFAULT, **(opts or {})}
+                       for ck, opts in (equity or {}).items()}
 
-# ══════════════════════════════════════════════════════════════════════════════
-# 7. AYACUCHO: ≤ 2 LOCALES SIMULTÁNEOS
-# ══════════════════════════════════════════════════════════════════════════════
-ayacucho = [n for n in ["DEFENSORES DE AYACUCHO","ATLETICO AYACUCHO",
-                         "SARMIENTO (AYACUCHO)","ATENEO ESTRADA"] if n in all_entities]
+        self.estadio_de   = {e["nombre"]: e.get("estadioLocal", "A confirmar")
+                             for e in equipos_data}
+        self.comp_defs    = list(comp_defs)
+        self.competitions = build_competitions(equipos_data, comp_defs)
+        self.all_entities = sorted({n for c in self.competitions.values()
+                                    for n in c["entities"]})
+        self.comp_sets    = {ck: frozenset(c["entities"])
+                             for ck, c in self.competitions.items()}
+        self.schedule  = schedule
+        self.store     = None
+        self.cb        = None           # ConstraintBuilder de build_model
+        self.rule_cache = RuleCache(cache_dir)
+        self.telemetry  = telemetry or Telemetry()
 
-for fecha in range(1, NUM_FECHAS+1):
-    aya_home = [v for n in ayacucho for v in home_vars_global(fecha, n)]
-    if len(aya_home) >= 3:
-        model.Add(sum(aya_home) <= 2)
+        # las reglas inválidas se avisan y no se compilan
+        self.reglas, self.reglas_invalidas = split_reglas(self.reglas, self.competitions)
+        for err in self.reglas_invalidas:
+            self._log(f"⚠️  {err} (omitida)")
+        for ck in self.equity:
+            if ck not in self.competitions:
+                self._log(f"⚠️  equidad: competencia desconocida {ck}")
+
+    @classmethod
+    def from_json(cls, path=EQUIPOS_JSON, **kwargs):
+        return cls(load_equipos(path), **kwargs)
+
+    def _log(self, msg=""):
+        if self.verbose:
+            print(msg)
+
+    def print_competitions(self):
+        self._log("=== COMPETENCIAS ===")
+        for ck, comp in self.competitions.items():
+            n = len(comp["entities"])
+            self._log(f"  {ck:12s}: {n:2d} equipos · {n-1:2d} locales/equipo · {2*legs(n):2d} rondas")
+
+    # ── Fase 1 ────────────────────────────────────────────────────────────────
+
+    def set_schedule(self, schedule):
+        """Cambia la agenda de fase 1 (None = canónica) e invalida los índices."""
+        self.schedule  = schedule
+        self.store     = None
+        self.cb        = None           # ConstraintBuilder de build_model
+
+    def search_phase1(self, n_candidates=200, top_k=3, seed=0, workers=None,
+                      local_iters=0):
+        """Busca agendas de fase 1 (ver fixture_phase1.search_schedules)."""
+        return search_schedules(self.competitions, self.reglas, self.ayacucho_def,
+                                self.num_fechas, n_candidates, top_k, seed, workers,
+                                local_iters)
+
+    def solve_candidates(self, candidates, **solve_kwargs):
+        """
+        Resuelve la fase 2 sobre cada agenda candidata y se queda con la mejor
+        (factible y de menor penalización). Deja esa agenda activa en el motor.
+        """
+        best, best_sched = None, None
+        for i, (score, detalle, sched) in enumerate(candidates, 1):
+            self._log(f"\n── Candidato fase 1 #{i}: score {score} {detalle}")
+            self.set_schedule(sched)
+            result = self.solve(**solve_kwargs)
+            if best is None or (result.ok and (not best.ok or result.objective < best.objective)):
+                best, best_sched = result, sched
+        self.set_schedule(best_sched)
+        return best
+
+    def build_phase1(self):
+        """Genera los partidos de fase 1 en un GameStore (idempotente)."""
+        if self.store is not None:
+            return self.store
+
+        with self.telemetry.phase("fase1") as rec:
+            # solver decide si A o B es local
+            store = GameStore(build_games(self.competitions, self.schedule), self.num_fechas)
+            rec["partidos"] = len(store)
+        # el round-robin fija la cantidad de fechas: con menos, las últimas
+        # quedarían sin ninguna restricción
+        if store.num_fechas > self.num_fechas:
+            raise ValueError(f"num_fechas={self.num_fechas} pero el round-robin de fase 1 "
+                             f"necesita {store.num_fechas} fechas")
+
+        self.store = store
+        self._log(f"\nFase 1 completada: {len(store)} partidos con fechas fijas")
+        return store
+
+    @property
+    def all_games(self):
+        """all_games[p] = (fecha, ck, A, B); alias del GameStore (None sin fase 1)."""
+        return self.store
+
+    # ── Fase 2: helpers sobre local[p] ────────────────────────────────────────
+    # Reciben nombres; internamente todo es por id del GameStore.
+
+    def lit_home(self, p, team):
+        """Literal entero (ver fixture_constraints): team es local en partido p."""
+        return self.store.lit_home(p, self.store.tidx[team])
+
+    def game_in(self, fecha, ck, team):
+        """Índice del partido de team en (fecha, ck), o None si está libre."""
+        st = self.store
+        if ck not in st.cidx or team not in st.tidx:
+            return None
+        return st.game_in(fecha, st.cidx[ck], st.tidx[team])
+
+    def games_on(self, fecha, team):
+        """Partidos de team en la fecha, en cualquier competencia."""
+        st = self.store
+        return st.at(fecha, st.tidx[team]) if team in st.tidx else ()
+
+    def opponent(self, p, team):
+        st = self.store
+        return st.teams[st.opponent(p, st.tidx[team])]
+
+    def is_local(self, p, team):
+        """Expresión lineal: 1 si team es local en partido p."""
+        st = self.store
+        t = st.tidx.get(team)
+        if t == st.home[p]: return self.local[p]
+        if t == st.away[p]: return self.local[p].Not()
+        raise ValueError(f"{team} no juega en partido {p}")
+
+    def is_visitor(self, p, team):
+        return self.is_local(p, team).Not()
+
+    def home_vars_global(self, fecha, team):
+        """Lista de vars 'team es local' en cualquier comp en fecha dada."""
+        return [self.is_local(p, team) for p in self.games_on(fecha, team)]
+
+    # Un equipo juega máx 1 partido/fecha POR COMPETENCIA. Entre competencias
+    # distintas pueden coincidir (local en una y visitante en otra está OK,
+    # salvo que una regla de co_local/cross lo impida).
+
+    def in_comp(self, ck, team):
+        return team in self.comp_sets.get(ck, ())
+
+    # ── Sección 5: restricciones cruzadas ─────────────────────────────────────
+
+    def co_local(self, ck_A, A, B):
+        """
+        Cuando A es local en ck_A → B no puede ser visitante (en ninguna comp).
+        Bidireccional: B local (global) → A no puede ser visitante en ck_A.
+
+        Por cada partido pB de B en la fecha, dos cláusulas binarias:
+          local_A(pA) + visit_B(pB) <= 1
+          visit_A(pA) + local_B(pB) <= 1
+
+        Nota: A juega max 1 partido/fecha/comp, así que pA es único.
+        Si pA ES el enfrentamiento directo A vs B (H2H) no se aplica.
+        """
+        if A not in self.all_entities or B not in self.all_entities: return
+        if not self.in_comp(ck_A, A): return
+        cb, st = self.cb, self.store
+        a, b, c = st.tidx[A], st.tidx[B], st.cidx[ck_A]
+
+        for fecha in range(1, self.num_fechas+1):
+            pA = st.game_in(fecha, c, a)
+            # Si no hay partidos ese día, o es el H2H, no hay restricción
+            if pA is None or st.opponent(pA, a) == b: continue
+
+            hA = st.lit_home(pA, a)
+            for pB in st.at(fecha, b):
+                hB = st.lit_home(pB, b)
+                cb.at_most_one(hA, ~hB, "co_local")
+                cb.at_most_one(~hA, hB, "co_local")
+
+    def cross(self, ck_A, A, ck_B_or_None, B):
+        """
+        Cruce: A y B siempre con condiciones OPUESTAS en sus torneos.
+        A local en ck_A → B no local en ck_B (o global si ck_B=None).
+        A visit en ck_A → B no visit.
+        """
+        if A not in self.all_entities or B not in self.all_entities: return
+        if not self.in_comp(ck_A, A): return
+        cb, st = self.cb, self.store
+        a, b, c = st.tidx[A], st.tidx[B], st.cidx[ck_A]
+        por_comp = ck_B_or_None and self.in_comp(ck_B_or_None, B)
+        c_B = st.cidx[ck_B_or_None] if por_comp else None
+
+        for fecha in range(1, self.num_fechas+1):
+            pA = st.game_in(fecha, c, a)
+            if pA is None: continue
+            if por_comp:
+                pB = st.game_in(fecha, c_B, b)
+                games_B = () if pB is None else (pB,)
+            else:
+                games_B = st.at(fecha, b)
+
+            hA = st.lit_home(pA, a)
+            for pB in games_B:
+                hB = st.lit_home(pB, b)
+                cb.at_most_one(hA, hB, "cross")
+                cb.at_most_one(~hA, ~hB, "cross")
+
+    def compile_rule(self, regla):
+        """
+        Fragmento de una regla: sus cláusulas en orden (ver fixture_rules).
+        Si cambian las cláusulas que emiten cross / co_local, subir
+        fixture_rules.FORMATO_CACHE.
+        """
+        compilar = {"cross": self.cross, "co_local": self.co_local}
+        if not regla or regla[0] not in compilar or len(regla) != TIPOS[regla[0]]:
+            raise ValueError(f"Regla inválida: {regla!r}")
+        self.build_phase1()
+        cb, self.cb = self.cb, ClauseRecorder()
+        try:
+            compilar[regla[0]](*regla[1:])
+            return self.cb.clauses
+        finally:
+            self.cb = cb
+
+    # ── Construcción del modelo ───────────────────────────────────────────────
+
+    def build_model(self, diagnose=False):
+        """
+        Construye un CpModel nuevo (secciones 4-8) sobre la fase 1 cacheada.
+
+        diagnose=True condiciona cada restricción dura a un literal de
+        supuesto (self.guards, ver diagnose()) y no agrega objetivo.
+        """
+        self.build_phase1()
+        P = len(self.store)
+        model = self.model = cp_model.CpModel()
+        self.guards = {} if diagnose else None
+
+        # local[p] = 1 → store.home[p] (equipo A) es local
+        # local[p] = 0 → store.away[p] (equipo B) es local
+        self.local = [model.NewBoolVar(f"loc_{p}") for p in range(P)]
+
+        tm = self.telemetry
+        ncons = lambda: len(model.Proto().constraints)
+
+        # ── 6. Reglas ─────────────────────────────────────────────────────────
+        self._log("\nAplicando restricciones de localía...")
+        with tm.phase("reglas") as rec:
+            self.cb = ConstraintBuilder()
+            pkey = phase1_key(self.store, self.num_fechas)
+            nuevas = 0
+            for i, regla in enumerate(self.reglas):
+                frag = self.rule_cache.get(pkey, regla)
+                if frag is None:
+                    frag = self.compile_rule(regla)
+                    self.rule_cache.put(pkey, regla, frag)
+                    nuevas += 1
+                if diagnose:
+                    self._emit_guarded(i, frag)
+                else:
+                    replay(self.cb, frag, regla[0])
+            self.rule_cache.save()
+            self.cb.emit(model, self.local)
+            rec.update(cons=ncons(), compiladas=nuevas, clausulas=self.cb.stats())
+        self._log(f"   reglas: {len(self.reglas) - nuevas} desde cache · {nuevas} compiladas")
+        for fam, (raw, emit) in self.cb.stats().items():
+            self._log(f"   {fam:9s}: {raw:5d} cláusulas generadas → {emit:5d} emitidas")
+
+        # ── 7. Ayacucho: ≤ 2 locales simultáneos ──────────────────────────────
+        with tm.phase("ayacucho") as rec:
+            n0 = ncons()
+            ayacucho = [n for n in self.ayacucho_def if n in self.all_entities]
+            for fecha in range(1, self.num_fechas+1):
+                aya_home = [v for n in ayacucho for v in self.home_vars_global(fecha, n)]
+                if len(aya_home) >= 3:
+                    self._guard(model.Add(sum(aya_home) <= 2), "ayacucho", fecha)
+            rec["cons"] = ncons() - n0
+
+        # ── 8. Alternancia: máximo 3 consecutivos + soft penalty ──────────────
+        with tm.phase("rachas", modo=self.streak_mode, scope=self.streak_scope) as rec:
+            n0 = ncons()
+            self.penalties = self._add_streaks()
+            rec.update(cons=ncons() - n0, penalties=len(self.penalties))
+
+        # ── 8b. Viajes: balance por equipo + tope de viajes largos seguidos ───
+        self.travel = []
+        if self.travel_weight or self.max_long_trips is not None:
+            with tm.phase("viajes", peso=self.travel_weight,
+                          largos=self.max_long_trips) as rec:
+                n0 = ncons()
+                self.travel = self._add_travel()
+                rec.update(cons=ncons() - n0, desvios=len(self.travel))
+
+        # ── 8c. Equidad por competencia ───────────────────────────────────────
+        if self.equity:
+            with tm.phase("equidad", competencias=sorted(self.equity)) as rec:
+                n0 = ncons()
+                rec["agregados"] = self._add_equity()
+                rec["cons"] = ncons() - n0
+
+        if not diagnose:
+            model.Minimize(self._objective())
+        return model
+
+    def _objective(self):
+        """Rachas de 3 + travel_weight · desvío de viaje (si se optimiza)."""
+        if self.travel_weight and self.travel:
+            return sum(self.penalties) + self.travel_weight * sum(self.travel)
+        return sum(self.penalties)
+
+    def _guard(self, ct, *key):
+        """En modo diagnóstico, condiciona `ct` al literal de supuesto de `key`."""
+        if self.guards is not None:
+            if key not in self.guards:
+                self.guards[key] = self.model.NewBoolVar("g_" + "_".join(map(str, key)))
+            ct.OnlyEnforceIf(self.guards[key])
+        return ct
+
+    def _emit_guarded(self, i, frag):
+        """Cláusulas de la regla i, cada una condicionada a (regla i, fecha)."""
+        for lits in frag:
+            if any(~l in lits for l in lits): continue
+            fecha = self.store.fecha[lits[0] if lits[0] >= 0 else ~lits[0]]
+            self._guard(self.model.AddBoolOr([to_cp(l, self.local) for l in lits]),
+                        "regla", i, fecha)
+
+    def _streak_sequences(self):
+        """
+        Secuencias de localía para las rachas: (etiqueta, {fecha: [lits local]}).
+          scope "global":      una por equipo, sumando todas sus competencias.
+          scope "competition": una por (equipo, competencia) — a lo sumo un
+                               partido por fecha, como pide restricciones.md.
+        """
+        NF = self.num_fechas
+        for n in self.all_entities:
+            if self.streak_scope == "global":
+                yield n, {f: [self.lit_home(p, n) for p in self.games_on(f, n)]
+                          for f in range(1, NF+1)}
+                continue
+            for ck in self.competitions:
+                if not self.in_comp(ck, n): continue
+                seq = {}
+                for f in range(1, NF+1):
+                    p = self.game_in(f, ck, n)
+                    seq[f] = [] if p is None else [self.lit_home(p, n)]
+                yield f"{n}_{ck}", seq
+
+    def _add_streaks(self):
+        """Sección 8: retorna las penalizaciones; self.streak_pen las agrupa por secuencia."""
+        penalties = []
+        self.streak_pen = {}
+        for label, home_lits in self._streak_sequences():
+            n0 = len(penalties)
+            # clauses / automaton necesitan un literal por fecha; un equipo
+            # con dos partidos en la misma fecha (scope global) usa la suma.
+            if self.streak_mode == "reified" or any(len(v) > 1 for v in home_lits.values()):
+                penalties += self._streaks_reified(label, home_lits)
+            else:
+                h = {f: lits[0] for f, lits in home_lits.items() if lits}
+                # AddAutomaton no admite enforcement: el diagnóstico usa cláusulas
+                if self.streak_mode == "automaton" and self.guards is None:
+                    self._streaks_automaton(label, h)
+                else:
+                    self._streaks_clauses(label, h)
+                penalties += self._streak_penalties_clauses(label, h)
+            self.streak_pen[label] = penalties[n0:]
+        return penalties
+
+    def _streaks_reified(self, n, home_lits):
+        """Encoding original: ventanas lineales + penalty reificada con OnlyEnforceIf."""
+        model, NF, local = self.model, self.num_fechas, self.local
+        penalties = []
+
+        # Construir secuencia de condición por fecha: 1=local, -1=visit, 0=libre
+        # Para rachas usamos vars booleanas por fecha
+        home_f  = {}  # fecha -> var o constante
+        away_f  = {}
+
+        for fecha in range(1, NF+1):
+            hv = [to_cp(l, local) for l in home_lits[fecha]]
+            av = [to_cp(~l, local) for l in home_lits[fecha]]
+            home_f[fecha] = hv[0] if len(hv) == 1 else (sum(hv) if hv else 0)
+            away_f[fecha] = av[0] if len(av) == 1 else (sum(av) if av else 0)
+
+        # Máximo 3 locales consecutivos (duro)
+        for d in range(1, NF - 2):
+            window = [home_f[d+k] for k in range(4) if d+k <= NF]
+            if len(window) == 4 and any(not isinstance(w, int) for w in window):
+                self._guard(model.Add(sum(window) <= 3), "rachas", n)
+
+        # Máximo 3 visitantes consecutivos (duro)
+        for d in range(1, NF - 2):
+            window = [away_f[d+k] for k in range(4) if d+k <= NF]
+            if len(window) == 4 and any(not isinstance(w, int) for w in window):
+                self._guard(model.Add(sum(window) <= 3), "rachas", n)
+
+        # Soft: penalizar ventanas de exactamente 3 locales/visitantes seguidos
+        for d in range(1, NF - 1):
+            w3h = [home_f[d+k] for k in range(3) if d+k <= NF]
+            if len(w3h) == 3 and any(not isinstance(w, int) for w in w3h):
+                pl = model.NewBoolVar(f"pl_{n}_{d}")
+                model.Add(sum(w3h) == 3).OnlyEnforceIf(pl)
+                model.Add(sum(w3h) <= 2).OnlyEnforceIf(pl.Not())
+                penalties.append(pl)
+
+            w3a = [away_f[d+k] for k in range(3) if d+k <= NF]
+            if len(w3a) == 3 and any(not isinstance(w, int) for w in w3a):
+                pv = model.NewBoolVar(f"pv_{n}_{d}")
+                model.Add(sum(w3a) == 3).OnlyEnforceIf(pv)
+                model.Add(sum(w3a) <= 2).OnlyEnforceIf(pv.Not())
+                penalties.append(pv)
+
+        return penalties
+
+    def _streaks_clauses(self, n, h):
+        """
+        Máximo 3 seguidos como cláusulas: en 4 fechas consecutivas con partido,
+        al menos una no es local y al menos una no es visitante. Una fecha
+        libre corta la racha, así que esas ventanas no generan nada.
+        """
+        model, local = self.model, self.local
+        for d in range(1, self.num_fechas - 2):
+            w = [h.get(d+k) for k in range(4)]
+            if None in w: continue
+            self._guard(model.AddBoolOr([to_cp(~l, local) for l in w]), "rachas", n)
+            self._guard(model.AddBoolOr([to_cp(l, local) for l in w]), "rachas", n)
+
+    def _streaks_automaton(self, n, h):
+        """
+        Máximo 3 seguidos con AddAutomaton sobre x[f] ∈ {0 libre, 1 local, 2 visit}.
+        Estados: 0 neutro, 1-3 racha local, 4-6 racha visitante; no hay
+        transición local desde 3 ni visitante desde 6.
+        """
+        model, local = self.model, self.local
+        xs = [2 - to_cp(h[f], local) if f in h else 0
+              for f in range(1, self.num_fechas+1)]
+        model.AddAutomaton(xs, 0, list(range(7)), STREAK_AUTOMATON)
+
+    def _streak_penalties_clauses(self, n, h):
+        """pl/pv ⇔ 3 locales/visitantes seguidos, con BoolAnd/BoolOr en vez de sumas."""
+        model, local = self.model, self.local
+        penalties = []
+        for d in range(1, self.num_fechas - 1):
+            w = [h.get(d+k) for k in range(3)]
+            if None in w: continue
+            for tag, lits in (("pl", w), ("pv", [~l for l in w])):
+                pen = model.NewBoolVar(f"{tag}_{n}_{d}")
+                model.AddBoolAnd([to_cp(l, local) for l in lits]).OnlyEnforceIf(pen)
+                model.AddBoolOr([to_cp(~l, local) for l in lits] + [pen])
+                penalties.append(pen)
+        return penalties
+
+    def _add_travel(self):
+        """
+        Sección 8b, sobre la matriz de distancias (ver fixture_travel).
+
+        Balance: en cada partido viaja el visitante, así que cada equipo
+        debería recorrer la mitad del total de sus cruces. desvío_t ≥
+        |viaje_t − total_t/2| (en unidades de KM_UNIDAD) va al objetivo con
+        peso travel_weight.
+
+        Viajes largos (≥ long_km): en max_long_trips + 1 fechas seguidas, al
+        menos una no es viaje largo (duro, condicionado en diagnóstico).
+        Retorna las variables de desvío.
+        """
+        st, model, local, NF = self.store, self.model, self.local, self.num_fechas
+        idx, D = load_distancias(self.distancias)
+        li, sin_loc = team_localities(self.equipos_data, st.teams, idx)
+        if sin_loc:
+            self._log(f"   ⚠️  sin localidad (viaje 0): {', '.join(sin_loc)}")
+        km    = game_distances(st, li, D)
+        units = (km + KM_UNIDAD // 2) // KM_UNIDAD
+        K     = self.max_long_trips
+
+        devs = []
+        for t, n in enumerate(st.teams):
+            por_fecha = [(f, st.at(f, t)) for f in range(1, NF+1)]
+            if self.travel_weight:
+                viaje = [(int(units[p]), to_cp(~st.lit_home(p, t), local))
+                         for _, ps in por_fecha for p in ps if units[p]]
+                total = sum(u for u, _ in viaje)
+                if total:
+                    dev = model.NewIntVar(0, total, f"dv_{n}")
+                    expr = 2 * sum(u * v for u, v in viaje) - total
+                    model.Add(2 * dev >= expr)
+                    model.Add(2 * dev >= -expr)
+                    devs.append(dev)
+            if K is None:
+                continue
+            largo = {}
+            for f, ps in por_fecha:
+                lits = [to_cp(~st.lit_home(p, t), local) for p in ps if km[p] >= self.long_km]
+                if len(lits) == 1:
+                    largo[f] = lits[0]
+                elif lits:                       # dos partidos en la fecha: alguno largo
+                    largo[f] = model.NewBoolVar(f"vl_{n}_{f}")
+                    model.AddMaxEquality(largo[f], lits)
+            for d in range(1, NF - K + 1):
+                w = [largo.get(d + k) for k in range(K + 1)]
+                if any(v is None for v in w): continue
+                self._guard(model.AddBoolOr([v.Not() for v in w]), "viajes", n)
+        return devs
+
+    def _add_equity(self):
+        """
+        Sección 8c: por competencia de self.equity, una variable entera por
+        equipo (rachas de 3; localías por vuelta) acotada por un par lo/hi
+        común a la competencia, en vez de comparar equipos de a pares:
+
+          rachas           cnt_t ≥ z y cnt_t ≤ |pen_t| · z, con z bool por
+                           competencia: o todos tienen racha o ninguno.
+          spread_rachas    lo ≤ cnt_t ≤ hi, hi − lo ≤ spread
+          spread_localias  ídem con loc_t,v = localías de t en la vuelta v
+
+        Las rachas se cuentan sobre las secuencias de la sección 8 (por equipo
+        en scope global, por equipo y competencia en scope competition).
+        Todo es duro y se condiciona a ("equidad", ck) en diagnóstico.
+        Retorna la cantidad de variables agregadas.
+        """
+        st, model, local = self.store, self.model, self.local
+        agregados = 0
+
+        def spread(xs, ub, s, name, ck):
+            lo = model.NewIntVar(0, ub, f"lo_{name}")
+            hi = model.NewIntVar(0, ub, f"hi_{name}")
+            for x in xs:
+                self._guard(model.Add(x >= lo), "equidad", ck)
+                self._guard(model.Add(x <= hi), "equidad", ck)
+            self._guard(model.Add(hi - lo <= s), "equidad", ck)
+
+        for ck, opts in self.equity.items():
+            if ck not in self.competitions: continue
+            entities, c = self.competitions[ck]["entities"], st.cidx[ck]
+            if opts["rachas"] or opts["spread_rachas"] is not None:
+                z = model.NewBoolVar(f"eq_racha_{ck}") if opts["rachas"] else None
+                cnts, ub = [], 0
+                for n in entities:
+                    pens = self.streak_pen.get(n if self.streak_scope == "global" else f"{n}_{ck}", [])
+                    cnt = model.NewIntVar(0, len(pens), f"nr_{n}_{ck}")
+                    model.Add(cnt == sum(pens))
+                    if opts["rachas"]:
+                        self._guard(model.Add(cnt >= z), "equidad", ck)
+                        self._guard(model.Add(cnt <= len(pens) * z), "equidad", ck)
+                    cnts.append(cnt)
+                    ub = max(ub, len(pens))
+                agregados += len(cnts)
+                if opts["spread_rachas"] is not None:
+                    spread(cnts, ub, opts["spread_rachas"], f"rachas_{ck}", ck)
+
+            if opts["spread_localias"] is not None:
+                nr = legs(len(entities))
+                for v, fechas in ((1, range(1, nr+1)), (2, range(nr+1, 2*nr+1))):
+                    locs = []
+                    for n in entities:
+                        t = st.tidx[n]
+                        lits = [to_cp(st.lit_home(p, t), local) for p in
+                                (st.game_in(f, c, t) for f in fechas) if p is not None]
+                        h = model.NewIntVar(0, len(lits), f"nl_{n}_{ck}_{v}")
+                        model.Add(h == sum(lits))
+                        locs.append(h)
+                    agregados += len(locs)
+                    spread(locs, nr, opts["spread_localias"], f"loc_{ck}_{v}", ck)
+        return agregados
+
+    def streak_counts(self, fixture):
+        """
+        Rachas de 3 de un fixture por secuencia, con las mismas etiquetas y
+        secuencias que _streak_sequences (según streak_scope): una ventana de
+        3 fechas cuenta si suma 3 localías o 3 visitas, como pl / pv.
+        """
+        NF = self.num_fechas
+        lados = defaultdict(lambda: defaultdict(lambda: [0, 0]))  # etiqueta → fecha → [L, V]
+        for g in fixture:
+            for n, lado in ((g["local"], 0), (g["visitante"], 1)):
+                label = n if self.streak_scope == "global" else f"{n}_{g['competencia']}"
+                lados[label][g["fecha"]][lado] += 1
+        return {label: sum(1 for d in range(1, NF - 1) for lado in (0, 1)
+                           if sum(seq[d + k][lado] for k in range(3) if d + k in seq) == 3)
+                for label, seq in lados.items()}
+
+    def equity_metrics(self, fixture):
+        """
+        Métricas de equidad de un fixture, por competencia: rachas de 3 de
+        cada equipo, contadas sobre la secuencia que restringe el modelo
+        (streak_counts) como (mín, máx, equipos con racha, equipos), y
+        localías por vuelta (mín, máx).
+        """
+        cond = defaultdict(dict)                    # (ck, equipo) → {fecha: ±1}
+        for g in fixture:
+            cond[(g["competencia"], g["local"])][g["fecha"]] = 1
+            cond[(g["competencia"], g["visitante"])][g["fecha"]] = -1
+        cnt = self.streak_counts(fixture)
+        out = {}
+        for ck, comp in self.competitions.items():
+            nr = legs(len(comp["entities"]))
+            rachas, locs = [], {1: [], 2: []}
+            for n in comp["entities"]:
+                seq = cond.get((ck, n), {})
+                rachas.append(cnt.get(n if self.streak_scope == "global" else f"{n}_{ck}", 0))
+                for v in (1, 2):
+                    locs[v].append(sum(1 for f, x in seq.items()
+                                       if x == 1 and (f <= nr) == (v == 1)))
+            out[ck] = {"rachas": (min(rachas), max(rachas),
+                                  sum(1 for r in rachas if r), len(rachas)),
+                       "localias": {v: (min(l), max(l)) for v, l in locs.items()}}
+        return out
+
+    # ── Resolución ────────────────────────────────────────────────────────────
+
+    def solve(self, max_time=300.0, workers=8, log=True,
+              previo=None, disruption_weight=0, unfreeze_teams=None,
+              decompose=False, parallel=None, anytime=None):
+        """
+        Construye el modelo, lo resuelve y retorna un FixtureResult.
+
+        Re-solve incremental (previo = fixture publicado, lista de dicts):
+          - sus localías se cargan como hints de local[p] (arranque en caliente);
+          - disruption_weight > 0 suma al objetivo w · (#inversiones de localía);
+          - unfreeze_teams: solo los partidos de esos equipos pueden cambiar,
+            el resto queda fijo a la localía publicada.
+
+        decompose=True resuelve cada componente conexa del modelo por separado
+        en un pool de `parallel` procesos (ver fixture_decompose), con hasta
+        `workers` workers CP-SAT cada uno. No admite `anytime`.
+
+        anytime = kwargs de AnytimeCallback (json_path, csv_path, stop_at, gap,
+        patience): guarda cada solución mejorante y corta la búsqueda antes.
+        """
+        if decompose and anytime is not None:
+            raise ValueError("anytime no está disponible con decompose=True "
+                             "(las componentes se resuelven en otros procesos)")
+        model = self.build_model()
+        self._log(f"\n🔄 Resolviendo v8 — {len(self.local)} vars de localía + "
+                  f"{len(self.penalties)} penalty vars")
+
+        flips = []
+        if previo is not None:
+            hints = self.hints_from_fixture(previo)
+            for p, v in hints.items():
+                model.AddHint(self.local[p], v)
+                flips.append(self.local[p].Not() if v else self.local[p])
+            if unfreeze_teams is not None:
+                self._pin_previo(hints, unfreeze_teams)
+            self._log(f"   Hints: {len(hints)}/{len(self.local)} partidos del fixture previo")
+            if disruption_weight and flips:
+                model.Minimize(self._objective() + disruption_weight * sum(flips))
+
+        tm = self.telemetry
+        tm.event("modelo", vars=len(model.Proto().variables),
+                 cons=len(model.Proto().constraints), workers=workers,
+                 max_time=max_time, decompose=decompose)
+        with tm.phase("solve") as rec:
+            if decompose:
+                self._log("\n🧩 Resolviendo por componentes conexas")
+                status, _, values, wall, sizes = solve_components(
+                    model, max_time, parallel, self._log, workers)
+                rec["componentes"] = sizes
+
+                def value(lit):
+                    i = lit.Index()
+                    return values[i] if i >= 0 else 1 - values[-i - 1]
+            else:
+                solver = cp_model.CpSolver()
+                solver.parameters.max_time_in_seconds = float(max_time)
+                solver.parameters.num_search_workers  = workers
+                solver.parameters.log_search_progress = log
+
+                if anytime is None:
+                    status = solver.Solve(model, ProgressCallback(tm))
+                else:
+                    cb = AnytimeCallback(self, tm, **anytime)
+                    cb.start()
+                    try:
+                        status = solver.Solve(model, cb)
+                    finally:
+                        cb.stop()
+                    rec.update(borradores=cb.drafts, parada=cb.reason)
+                    if cb.reason:
+                        self._log(f"\n⏹  Parada temprana: {cb.reason}")
+                wall, value = solver.WallTime(), solver.Value
+                rec.update(cota=solver.BestObjectiveBound(),
+                           conflictos=solver.NumConflicts(), ramas=solver.NumBranches())
+            rec.update(estado=STATUS_NAMES.get(status, str(status)), wall_s=round(wall, 4))
+        self._log(f"\nEstado: {STATUS_TXT.get(status, str(status))}")
+
+        result = FixtureResult(status=status, wall_time=wall)
+        if result.ok:
+            result.objective = sum(value(v) for v in self.penalties)
+            result.fixture = self.fixture_from_values(
+                [value(v) for v in self.local])
+            if previo is not None:
+                result.flips = sum(value(f) for f in flips)
+            if self.travel:
+                result.travel = sum(value(v) for v in self.travel)
+        return result
+
+    # ── Diagnóstico de infactibilidad ─────────────────────────────────────────
+
+    def _infeasible(self, keys, max_time):
+        """Resuelve con los supuestos `keys`. Retorna (infactible, núcleo ⊆ keys)."""
+        self.model.ClearAssumptions()
+        self.model.AddAssumptions([self.guards[k] for k in keys])
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = float(max_time)
+        solver.parameters.num_search_workers  = 1   # el núcleo requiere 1 worker
+        status = solver.Solve(self.model)
+        if status != cp_model.INFEASIBLE:
+            return False, keys
+        core = set(solver.SufficientAssumptionsForInfeasibility())
+        return True, [k for k in keys if self.guards[k].Index() in core]
+
+    def _pin_previo(self, hints, unfreeze_teams):
+        """
+        Re-solve con equipos libres: fija la localía publicada de cada partido
+        sin equipos libres. En diagnóstico la fijación queda condicionada a
+        ("previo", equipo) de sus dos equipos.
+        """
+        st, libres = self.store, set(unfreeze_teams)
+        for p, v in hints.items():
+            A, B = st.teams[st.home[p]], st.teams[st.away[p]]
+            if libres & {A, B}: continue
+            ct = self.model.Add(self.local[p] == v)
+            self._guard(ct, "previo", A)
+            self._guard(ct, "previo", B)
+
+    def diagnose(self, max_time=60.0, minimize=True, previo=None, unfreeze_teams=None):
+        """
+        Busca un conjunto de restricciones en conflicto. Cada regla (por
+        fecha), el tope de Ayacucho (por fecha), las rachas (por secuencia)
+        y, con previo + unfreeze_teams (mismos argumentos que solve()), las
+        localías fijadas del fixture previo (por equipo)
+        quedan condicionadas a un literal de supuesto; si el modelo es
+        INFACTIBLE, CP-SAT devuelve un subconjunto suficiente de supuestos.
+        minimize=True lo reduce a uno mínimo por eliminación (un solve por
+        supuesto del núcleo). Retorna la lista de claves del núcleo ([] si
+        el modelo es factible o no se pudo probar).
+        """
+        self.build_model(diagnose=True)
+        if previo is not None and unfreeze_teams is not None:
+            self._pin_previo(self.hints_from_fixture(previo), unfreeze_teams)
+        keys = list(self.guards)
+        self._log(f"\n🔎 Diagnóstico: {len(keys)} supuestos")
+        infeasible, core = self._infeasible(keys, max_time)
+        if not infeasible:
+            return []
+        self._log(f"   núcleo inicial: {len(core)} supuestos")
+        if minimize:
+            i = 0
+            while i < len(core):
+                trial = core[:i] + core[i+1:]
+                still, sub = self._infeasible(trial, max_time)
+                if still:
+                    core = sub          # el sub-núcleo puede ser aún menor
+                else:
+                    i += 1              # core[i] es necesario
+            self._log(f"   núcleo mínimo:  {len(core)} supuestos")
+        return core
+
+    def describe_conflict(self, core):
+        """Agrupa las claves del núcleo: reglas con sus fechas, Ayacucho, rachas y el resto por equipo/competencia."""
+        reglas, ayacucho, rachas, otros = defaultdict(list), [], [], []
+        for key in core:
+            if key[0] == "regla":
+                reglas[key[1]].append(key[2])
+            elif key[0] == "ayacucho":
+                ayacucho.append(key[1])
+            elif key[0] in ("viajes", "equidad", "previo"):
+                otros.append(key)
+            else:
+                rachas.append(key[1])
+        out = []
+        for i, fechas in sorted(reglas.items()):
+            tipo, ck_A, A, *rest = self.reglas[i]
+            out.append({"tipo": tipo, "regla": i + 1, "competencia": ck_A,
+                        "clubes": [A, rest[-1]], "fechas": sorted(fechas)})
+        if ayacucho:
+            out.append({"tipo": "ayacucho", "clubes": self.ayacucho_def,
+                        "fechas": sorted(ayacucho)})
+        for label in rachas:
+            out.append({"tipo": "rachas", "clubes": [label], "fechas": []})
+        for tipo, label in otros:
+            out.append({"tipo": tipo, "clubes": [label], "fechas": []})
+        return out
+
+    def print_conflict(self, core):
+        print("\n=== CONFLICTO ===")
+        if not core:
+            print("  (no se encontró: el modelo es factible o se agotó el tiempo)")
+            return
+        for c in self.describe_conflict(core):
+            fechas = f" · fechas {c['fechas']}" if c["fechas"] else ""
+            regla = f" #{c['regla']} {c['competencia']}" if "regla" in c else ""
+            print(f"  {c['tipo']:9s}{regla}: {' ↔ '.join(c['clubes'])}{fechas}")
+
+    def hints_from_fixture(self, fixture):
+        """
+        Mapea un fixture exportado sobre local[p]: {p: 1 si A fue local, 0 si no}.
+        Los partidos se identifican por (fecha, competencia, {A, B}); los que no
+        aparecen en `fixture` (fase 1 distinta, equipo nuevo) quedan sin hint.
+        """
+        st = self.build_phase1()
+        hints = {}
+        for g in fixture:
+            c, t = st.cidx.get(g["competencia"]), st.tidx.get(g["local"])
+            if c is None or t is None: continue
+            p = st.game_in(g["fecha"], c, t)
+            if p is not None and st.teams[st.opponent(p, t)] == g["visitante"]:
+                hints[p] = 1 if st.home[p] == t else 0
+        return hints
+
+    def fixture_from_values(self, values):
+        """Convierte los valores de local[p] en la lista de partidos exportable."""
+        st = self.store
+        estadio = [self.estadio_de.get(t, "A confirmar") for t in st.teams]
+        fixture = []
+        for p in range(len(st)):
+            if values[p] == 1:
+                loc, vis = st.home[p], st.away[p]
+            else:
+                loc, vis = st.away[p], st.home[p]
+            fixture.append({
+                "competencia": st.comps[st.comp[p]],
+                "fecha":  st.fecha[p],
+                "local":  st.teams[loc],
+                "visitante": st.teams[vis],
+                "estadio": estadio[loc],
+            })
+
+        fixture.sort(key=lambda x: (x["competencia"], x["fecha"], x["local"]))
+        return fixture
+
+    # ── Fase 3: día y horario ─────────────────────────────────────────────────
+
+    def schedule_slots(self, result, canchas=None, parallel=None, max_time=10.0):
+        """
+        Fase 3 sobre un resultado de fase 2: agrega "dia" y "horario" a cada
+        partido (ver fixture_phase3). Retorna {fecha: status}.
+        """
+        with self.telemetry.phase("fase3") as rec:
+            result.fixture, statuses = assign_slots(
+                result.fixture, self.equipos_data, canchas, parallel, max_time, self._log)
+            rec["sin_horario"] = [f for f, st in statuses.items()
+                                  if st not in (cp_model.OPTIMAL, cp_model.FEASIBLE)]
+        return statuses
+
+    # ── Export y reporte ──────────────────────────────────────────────────────
+
+    @property
+    def csv_categories(self):
+        """Filas del CSV del visor por competencia (ver fixture_export)."""
+        return category_rows(self.equipos_data, self.comp_defs)
+
+    def export(self, result, path=OUTPUT_JSON, csv_path=None, ndjson_path=None,
+               out_dir=None):
+        """
+        Escribe el fixture en una sola pasada (ver fixture_export): JSON y,
+        si se piden, CSV del visor, NDJSON y vistas por club/estadio + índice.
+        """
+        with self.telemetry.phase("export", partidos=len(result.fixture)) as rec:
+            index = export_fixture(result.fixture, self.equipos_data, self.comp_defs,
+                                   path, csv_path, ndjson_path, out_dir)
+            rec["filas_csv"] = index["filas_csv"]
+        self._log(f"✅ {len(result.fixture)} partidos → {path}")
+        for extra in (csv_path, ndjson_path, out_dir):
+            if extra:
+                self._log(f"   → {extra}")
+        return path
+
+    def print_report(self, result):
+        fixture = result.fixture
+        print(f"   Penalización rachas de 3: {result.objective}")
+        if result.flips is not None:
+            print(f"   Localías invertidas vs. fixture previo: {result.flips}")
+        if result.travel is not None:
+            print(f"   Desvío de viajes: {result.travel} × {KM_UNIDAD} km")
+
+        cnt = Counter(p["competencia"] for p in fixture)
+        print("\n=== RESUMEN ===")
+        for ck in sorted(cnt):
+            n   = len(self.competitions[ck]["entities"])
+            exp = n * (n - 1)
+            print(f"  {'✓' if cnt[ck]==exp else '⚠'} {ck:12s}: {cnt[ck]:4d}/{exp:4d}")
+
+        # Verificación femenino/masculino
+        cond = defaultdict(lambda: 'libre')
+        for p in fixture:
+            cond[(p['fecha'], p['local'])]     = 'local'
+            cond[(p['fecha'], p['visitante'])] = 'visitante'
+
+        print("\n=== VERIFICACIÓN FEMENINO/MASCULINO ===")
+        for tipo, M, F in CHECKS:
+            v = sum(1 for f in range(1, self.num_fechas+1)
+                    if cond[(f,M)] != 'libre' and cond[(f,F)] != 'libre'
+                    and (cond[(f,M)] == cond[(f,F)] if tipo=="cross"
+                         else (cond[(f,M)]=='local' and cond[(f,F)]=='visitante')))
+            print(f"  {'✅' if v==0 else f'❌ {v}':<6} {tipo.upper()} {M} ↔ {F}")
+
+        print("\n=== EQUIDAD (rachas de 3 por equipo · localías por vuelta) ===")
+        for ck, m in self.equity_metrics(fixture).items():
+            lo, hi, con, n = m["rachas"]
+            (l1, h1), (l2, h2) = m["localias"][1], m["localias"][2]
+            opts = self.equity.get(ck, EQUIDAD_DEFAULT)     # umbrales configurados
+            s_loc, s_rach = opts["spread_localias"], opts["spread_rachas"]
+            ok = ((not opts["rachas"] or con in (0, n))
+                  and (s_rach is None or hi - lo <= s_rach)
+                  and (s_loc is None or max(h1 - l1, h2 - l2) <= s_loc))
+            modo = " · modo equidad" if ck in self.equity else ""
+            print(f"  {'✅' if ok else '⚠️ '} {ck:12s} rachas {lo}-{hi} ({con}/{n} con racha) · "
+                  f"localías v1 {l1}-{h1} · v2 {l2}-{h2}{modo}")
+
+        if self.travel_weight or self.max_long_trips is not None:
+            viajes = travel_by_team(fixture, self.equipos_data, self.distancias, self.long_km)
+            orden  = sorted(viajes.items(), key=lambda kv: -kv[1][0])
+            print(f"\n=== VIAJES (km como visitante · máx. fechas seguidas ≥ {self.long_km} km) ===")
+            for n, (km, seguidas) in orden[:5] + [("…", (None, None))] + orden[-3:]:
+                print("  …" if km is None else f"  {n:34s} {km:5d} km · {seguidas}")
 
-# ══════════════════════════════════════════════════════════════════════════════
-# 8. ALTERNANCIA: MÁXIMO 3 CONSECUTIVOS + SOFT PENALTY
-# ══════════════════════════════════════════════════════════════════════════════
-penalties = []
-
-for n in all_entities:
-    # Construir secuencia de condición por fecha: 1=local, -1=visit, 0=libre
-    # Para rachas usamos vars booleanas por fecha
-    home_f  = {}  # fecha -> var o constante
-    away_f  = {}
-
-    for fecha in range(1, NUM_FECHAS+1):
-        hv = home_vars_global(fecha, n)
-        av = away_vars_global(fecha, n)
-        home_f[fecha] = hv[0] if len(hv) == 1 else (sum(hv) if hv else 0)
-        away_f[fecha] = av[0] if len(av) == 1 else (sum(av) if av else 0)
-
-    # Máximo 3 locales consecutivos (duro)
-    for d in range(1, NUM_FECHAS - 2):
-        window = [home_f[d+k] for k in range(4) if d+k <= NUM_FECHAS]
-        if len(window) == 4 and any(not isinstance(w, int) for w in window):
-            model.Add(sum(window) <= 3)
-
-    # Máximo 3 visitantes consecutivos (duro)
-    for d in range(1, NUM_FECHAS - 2):
-        window = [away_f[d+k] for k in range(4) if d+k <= NUM_FECHAS]
-        if len(window) == 4 and any(not isinstance(w, int) for w in window):
-            model.Add(sum(window) <= 3)
-
-    # Soft: penalizar ventanas de exactamente 3 locales/visitantes seguidos
-    for d in range(1, NUM_FECHAS - 1):
-        w3h = [home_f[d+k] for k in range(3) if d+k <= NUM_FECHAS]
-        if len(w3h) == 3 and any(not isinstance(w, int) for w in w3h):
-            pl = model.NewBoolVar(f"pl_{n}_{d}")
-            model.Add(sum(w3h) == 3).OnlyEnforceIf(pl)
-            model.Add(sum(w3h) <= 2).OnlyEnforceIf(pl.Not())
-            penalties.append(pl)
-
-        w3a = [away_f[d+k] for k in range(3) if d+k <= NUM_FECHAS]
-        if len(w3a) == 3 and any(not isinstance(w, int) for w in w3a):
-            pv = model.NewBoolVar(f"pv_{n}_{d}")
-            model.Add(sum(w3a) == 3).OnlyEnforceIf(pv)
-            model.Add(sum(w3a) <= 2).OnlyEnforceIf(pv.Not())
-            penalties.append(pv)
-
-model.Minimize(sum(penalties))
 
 # ══════════════════════════════════════════════════════════════════════════════
-# 9. RESOLUCIÓN
+# 9. RESOLUCIÓN (script)
 # ══════════════════════════════════════════════════════════════════════════════
-print(f"\n🔄 Resolviendo v8 — {P} vars de localía + {len(penalties)} penalty vars")
-solver = cp_model.CpSolver()
-solver.parameters.max_time_in_seconds = 300.0
-solver.parameters.num_search_workers  = 8
-solver.parameters.log_search_progress = True
 
-status = solver.Solve(model)
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Genera el fixture (v8, dos fases).")
+    ap.add_argument("--max-time", type=float, default=300.0)
+    ap.add_argument("--previo", metavar="JSON",
+                    help="fixture publicado: re-solve incremental con hints")
+    ap.add_argument("--min-disrupcion", type=int, default=0, metavar="W",
+                    help="peso por cada localía invertida respecto de --previo")
+    ap.add_argument("--libres", metavar="EQ1,EQ2",
+                    help="con --previo: solo estos equipos pueden cambiar localías")
+    ap.add_argument("--rachas", default="reified", choices=STREAK_MODES,
+                    help="encoding de la sección 8")
+    ap.add_argument("--rachas-scope", default="global", choices=STREAK_SCOPES,
+                    help="rachas por equipo (global) o por equipo y competencia")
+    ap.add_argument("--fase1-candidatos", type=int, default=0, metavar="N",
+                    help="buscar entre N agendas de round-robin (0 = canónica)")
+    ap.add_argument("--fase1-top", type=int, default=3, metavar="K",
+                    help="cuántas de las mejores agendas pasan a CP-SAT")
+    ap.add_argument("--fase1-iter", type=int, default=0, metavar="I",
+                    help="pasos de búsqueda local sobre cada agenda top")
+    ap.add_argument("--semilla", type=int, default=0)
+    ap.add_argument("--componentes", action="store_true",
+                    help="resolver cada componente conexa del modelo por separado")
+    ap.add_argument("--parallel", type=int, default=None,
+                    help="con --componentes: subproblemas simultáneos")
+    ap.add_argument("--reglas", default=REGLAS_JSON, metavar="JSON",
+                    help="archivo de reglas cross/co_local")
+    ap.add_argument("--sin-cache", action="store_true",
+                    help="no leer ni escribir fragmentos compilados en disco")
+    ap.add_argument("--sin-diagnostico", action="store_true",
+                    help="si es INFACTIBLE, no buscar el conjunto de reglas en conflicto")
+    ap.add_argument("--anytime", action="store_true",
+                    help="escribir cada solución mejorante (JSON + CSV) apenas aparece")
+    ap.add_argument("--objetivo-rachas", type=int, default=None, metavar="N",
+                    help="cortar cuando la penalización de rachas sea ≤ N")
+    ap.add_argument("--gap", type=float, default=None, metavar="G",
+                    help="cortar cuando el gap relativo sea ≤ G (p.ej. 0.05)")
+    ap.add_argument("--paciencia", type=float, default=None, metavar="S",
+                    help="cortar tras S segundos sin mejorar")
+    ap.add_argument("--peso-viajes", type=int, default=0, metavar="W",
+                    help=f"peso del desvío de viaje por equipo (por cada {KM_UNIDAD} km) "
+                         "frente a 1 por racha de 3")
+    ap.add_argument("--viajes-largos", type=int, default=None, metavar="K",
+                    help="máximo de fechas seguidas con viaje largo")
+    ap.add_argument("--km-largo", type=int, default=KM_LARGO, metavar="KM",
+                    help="distancia desde la que un viaje cuenta como largo")
+    ap.add_argument("--distancias", default=DISTANCIAS_JSON, metavar="JSON",
+                    help="matriz de distancias entre localidades")
+    ap.add_argument("--equidad", metavar="CK1,CK2",
+                    help="modo equidad en estas competencias ('todas' = todas)")
+    ap.add_argument("--spread-localias", type=int, default=EQUIDAD_DEFAULT["spread_localias"],
+                    metavar="N", help="con --equidad: máx − mín de localías por vuelta")
+    ap.add_argument("--spread-rachas", type=int, default=None, metavar="N",
+                    help="con --equidad: máx − mín de rachas de 3 por equipo")
+    ap.add_argument("--equidad-sin-rachas", action="store_true",
+                    help="con --equidad: no exigir que, si un equipo tiene una racha "
+                         "de 3, todos tengan alguna")
+    ap.add_argument("--horarios", action="store_true",
+                    help="fase 3: asignar día y horario con capacidad por estadio")
+    ap.add_argument("--parallel-horarios", type=int, default=None, metavar="N",
+                    help="con --horarios: fechas resueltas a la vez (default: núcleos)")
+    ap.add_argument("--sin-telemetria", action="store_true",
+                    help=f"no escribir {os.path.basename(TELEMETRY_JSONL)} ni "
+                         f"{os.path.basename(SUMMARY_JSON)}")
+    args = ap.parse_args(argv)
+    if args.componentes and (args.anytime or args.objetivo_rachas is not None
+                             or args.gap or args.paciencia):
+        ap.error("--componentes no admite --anytime/--objetivo-rachas/--gap/--paciencia")
+
+    tm = Telemetry(None if args.sin_telemetria else TELEMETRY_JSONL)
+    try:
+        with tm.phase("datos") as rec:
+            equipos_data = load_equipos(EQUIPOS_JSON)
+            reglas = load_reglas(args.reglas, build_competitions(equipos_data))
+            previo = load_fixture(args.previo) if args.previo else None
+            rec.update(equipos=len(equipos_data), reglas=len(reglas))
+    except FileNotFoundError as exc:
+        sys.exit(f"❌ No se encontró '{exc.filename}'.")
+    except ValueError as exc:
+        sys.exit(f"❌ {exc}")
+
+    equity = None
+    if args.equidad:
+        cks = (build_competitions(equipos_data) if args.equidad == "todas"
+               else args.equidad.split(","))
+        equity = {ck: {"rachas": not args.equidad_sin_rachas,
+                       "spread_localias": args.spread_localias,
+                       "spread_rachas": args.spread_rachas} for ck in cks}
+
+    engine = FixtureEngine(equipos_data, reglas=reglas, streak_mode=args.rachas,
+                           streak_scope=args.rachas_scope,
+                           cache_dir=None if args.sin_cache else CACHE_DIR,
+                           telemetry=tm, travel_weight=args.peso_viajes,
+                           max_long_trips=args.viajes_largos, long_km=args.km_largo,
+                           distancias=args.distancias, equity=equity)
+
+    engine.print_competitions()
+    max_time = args.max_time
+    solve_kwargs = dict(
+        max_time=max_time, previo=previo,
+        disruption_weight=args.min_disrupcion,
+        unfreeze_teams=args.libres.split(",") if args.libres else None,
+        decompose=args.componentes, parallel=args.parallel)
+    if args.anytime or args.objetivo_rachas is not None or args.gap or args.paciencia:
+        solve_kwargs["anytime"] = dict(
+            json_path=OUTPUT_JSON if args.anytime else None,
+            csv_path=OUTPUT_CSV if args.anytime else None,
+            stop_at=args.objetivo_rachas, gap=args.gap, patience=args.paciencia)
+    if args.fase1_candidatos:
+        with tm.phase("busqueda_fase1", candidatos=args.fase1_candidatos):
+            candidates = engine.search_phase1(args.fase1_candidatos, args.fase1_top,
+                                              args.semilla, local_iters=args.fase1_iter)
+        result = engine.solve_candidates(candidates, **solve_kwargs)
+    else:
+        result = engine.solve(**solve_kwargs)
+
+    if result.ok:
+        if args.horarios:
+            engine.schedule_slots(result, parallel=args.parallel_horarios)
+        engine.export(result, OUTPUT_JSON, OUTPUT_CSV, OUTPUT_NDJSON, EXPORT_DIR)
+        engine.print_report(result)
+    elif result.status == cp_model.INFEASIBLE:
+        print("\n❌ INFACTIBLE — hay un conflicto lógico entre restricciones.")
+        if not args.sin_diagnostico:
+            engine.print_conflict(engine.diagnose(max_time, previo=previo,
+                                                  unfreeze_teams=solve_kwargs["unfreeze_teams"]))
+    else:
+        print(f"\n❓ Sin solución en {max_time:.0f}s. Probar con 600s o revisar restricciones.")
+
+    tm.summary(None if args.sin_telemetria else SUMMARY_JSON,
+               estado=result.status_name, objetivo=result.objective,
+               partidos=len(result.fixture), rachas=args.rachas, viajes=result.travel,
+               rachas_scope=args.rachas_scope)
+    return result
 
-STATUS_TXT = {
-    cp_model.OPTIMAL:    "✅ ÓPTIMO",
-    cp_model.FEASIBLE:   "⚡ FACTIBLE (tiempo agotado antes del óptimo)",
-    cp_model.INFEASIBLE: "❌ INFACTIBLE",
-    cp_model.UNKNOWN:    "❓ DESCONOCIDO",
-}
-print(f"\nEstado: {STATUS_TXT.get(status, str(status))}")
-
-if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-    fixture = []
-    for p, (fecha, ck, A, B) in enumerate(all_games):
-        if solver.Value(local[p]) == 1:
-            loc, vis = A, B
-        else:
-            loc, vis = B, A
-        fixture.append({
-            "competencia": ck,
-            "fecha":  fecha,
-            "local":  loc,
-            "visitante": vis,
-            "estadio": estadio_de.get(loc, "A confirmar"),
-        })
 
-    fixture.sort(key=lambda x: (x["competencia"], x["fecha"], x["local"]))
-
-    out = os.path.join(SCRIPT_DIR, "fixture_output.json")
-    with open(out, "w", encoding="utf-8") as fh:
-        json.dump(fixture, fh, indent=4, ensure_ascii=False)
-
-    print(f"✅ {len(fixture)} partidos → {out}")
-    print(f"   Penalización rachas de 3: {int(solver.ObjectiveValue())}")
-
-    from collections import Counter, defaultdict
-    cnt = Counter(p["competencia"] for p in fixture)
-    print("\n=== RESUMEN ===")
-    for ck in sorted(cnt):
-        n   = len(COMPETITIONS[ck]["entities"])
-        exp = n * (n - 1)
-        print(f"  {'✓' if cnt[ck]==exp else '⚠'} {ck:12s}: {cnt[ck]:4d}/{exp:4d}")
-
-    # Verificación femenino/masculino
-    cond = defaultdict(lambda: 'libre')
-    for p in fixture:
-        cond[(p['fecha'], p['local'])]     = 'local'
-        cond[(p['fecha'], p['visitante'])] = 'visitante'
-
-    print("\n=== VERIFICACIÓN FEMENINO/MASCULINO ===")
-    checks = [
-        ("cross", "Independiente",       "Independiente Femenino"),
-        ("cross", "Ferrocarril Sud",      "Ferrocarril Sud Femenino"),
-        ("cross", "Excursionistas",       "Excursionistas Femenino"),
-        ("cross", "Gimnasia y Esgrima",   "Gimnasia y Esgrima Femenino"),
-        ("cross", "Santamarina",          "Santamarina Femenino"),
-        ("cross", "Juarense",             "Juarense Femenino"),
-        ("cross", "ATLETICO AYACUCHO",    "ATLETICO AYACUCHO Femenino"),
-        ("coloc", "Loma Negra",           "Loma Negra Femenino"),
-        ("coloc", "SAN LORENZO (RAUCH)",  "SAN LORENZO (RAUCH) Femenino"),
-    ]
-    for tipo, M, F in checks:
-        v = sum(1 for f in range(1, NUM_FECHAS+1)
-                if cond[(f,M)] != 'libre' and cond[(f,F)] != 'libre'
-                and (cond[(f,M)] == cond[(f,F)] if tipo=="cross"
-                     else (cond[(f,M)]=='local' and cond[(f,F)]=='visitante')))
-        print(f"  {'✅' if v==0 else f'❌ {v}':<6} {tipo.upper()} {M} ↔ {F}")
-
-elif status == cp_model.INFEASIBLE:
-    print("\n❌ INFACTIBLE — hay un conflicto lógico entre restricciones.")
-    print("   Ejecutar con solo el bloque 5 (sin rachas) para confirmar.")
-else:
-    print("\n❓ Sin solución en 300s. Probar con 600s o revisar restricciones.")
+if __name__ == "__main__":
+    main()
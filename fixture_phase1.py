@@ -0,0 +1,267 @@
+"""
+fixture_phase1.py  ·  Fase 1: estructuras de round-robin
+=========================================================
+
+La fase 1 fija la fecha de cada partido antes de que CP-SAT vea las reglas
+de cruce/co-local. Una "agenda" (schedule) describe, por competencia:
+
+    {ck: (orden, rot, espejo)}
+
+    orden   permutación de equipos → posiciones del círculo
+    rot     ronda con la que arranca la vuelta 1
+    espejo  desfasaje de la vuelta 2 respecto de la vuelta 1
+            (espejo = nr-1 repetiría el mismo rival en fechas nr y nr+1)
+
+La agenda canónica (orden alfabético, rot=0, espejo=0) es la de v8.
+
+search_schedules() genera candidatos con un RNG con semilla, los evalúa en
+paralelo con una heurística en Python puro, mejora los mejores con una
+búsqueda local (intercambio de dos equipos / nueva rotación o espejo) y
+retorna los mejores. La heurística modela cada regla como una relación de
+paridad entre dos partidos de la misma fecha (co_local: misma condición,
+cross: opuesta) y cuenta con union-find:
+  - conflictos de paridad (ciclos impares → fase 2 infactible),
+  - reglas co_local anuladas por un enfrentamiento directo (H2H),
+  - fechas donde el tope de Ayacucho (≤ 2 locales) queda forzado.
+"""
+
+import os, random
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+
+def round_robin_rounds(teams):
+    """Algoritmo de rotación. Retorna lista de rondas [(t1,t2), ...]."""
+    t = list(teams)
+    if len(t) % 2 == 1:
+        t.append("BYE")
+    n = len(t)
+    fixed, rotating = t[0], t[1:]
+    rounds = []
+    for _ in range(n - 1):
+        circle = [fixed] + rotating
+        pairs = [(circle[i], circle[n-1-i])
+                 for i in range(n//2)
+                 if circle[i] != "BYE" and circle[n-1-i] != "BYE"]
+        rounds.append(pairs)
+        rotating = [rotating[-1]] + rotating[:-1]
+    return rounds
+
+def legs(n):
+    """Fechas por vuelta de un round-robin de n equipos (con BYE si n es impar)."""
+    return n - 1 if n % 2 == 0 else n
+
+# ══════════════════════════════════════════════════════════════════════════════
+# AGENDAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def canonical_schedule(competitions):
+    return {ck: (tuple(c["entities"]), 0, 0) for ck, c in competitions.items()}
+
+def random_schedule(competitions, rng):
+    sched = {}
+    for ck, c in competitions.items():
+        orden = list(c["entities"])
+        rng.shuffle(orden)
+        nr = legs(len(orden))
+        espejos = [m for m in range(nr) if m != nr - 1] or [0]
+        sched[ck] = (tuple(orden), rng.randrange(nr), rng.choice(espejos))
+    return sched
+
+def build_games(competitions, schedule=None):
+    """all_games[p] = (fecha, ck, A, B) según la agenda (canónica si None)."""
+    schedule = schedule or canonical_schedule(competitions)
+    all_games = []
+    for ck in competitions:
+        orden, rot, espejo = schedule[ck]
+        rounds = round_robin_rounds(orden)
+        nr = len(rounds)
+        # Vuelta 1: fechas 1..nr
+        for r in range(nr):
+            for t1, t2 in rounds[(r + rot) % nr]:
+                all_games.append((r + 1, ck, t1, t2))
+        # Vuelta 2: fechas nr+1..2*nr
+        for r in range(nr):
+            for t1, t2 in rounds[(r + rot + espejo) % nr]:
+                all_games.append((nr + r + 1, ck, t1, t2))
+    return all_games
+
+# ══════════════════════════════════════════════════════════════════════════════
+# HEURÍSTICA
+# ══════════════════════════════════════════════════════════════════════════════
+
+class _Parity:
+    """Union-find con paridad: x[a] XOR x[b] = rel."""
+
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.par    = [0] * n
+
+    def find(self, a):
+        path = []
+        while self.parent[a] != a:
+            path.append(a)
+            a = self.parent[a]
+        # compresión: acumular paridad desde el final del camino
+        acc = 0
+        for node in reversed(path):
+            acc ^= self.par[node]
+            self.par[node] = acc
+            self.parent[node] = a
+        return a
+
+    def parity(self, a):
+        self.find(a)
+        return self.par[a] if self.parent[a] != a else 0
+
+    def union(self, a, b, rel):
+        """Retorna False si la relación contradice las anteriores."""
+        ra, rb = self.find(a), self.find(b)
+        pa, pb = self.parity(a), self.parity(b)
+        if ra == rb:
+            return (pa ^ pb) == rel
+        self.parent[rb] = ra
+        self.par[rb] = pa ^ pb ^ rel
+        return True
+
+
+def score_schedule(competitions, reglas, ayacucho, num_fechas, schedule):
+    """
+    Heurística de fase 1 (menor es mejor). Retorna (score, detalle) con
+    detalle = {"paridad": n, "h2h": n, "ayacucho": n}.
+    """
+    games = build_games(competitions, schedule)
+    comp_sets = {ck: frozenset(c["entities"]) for ck, c in competitions.items()}
+    entities  = frozenset().union(*comp_sets.values())
+    by_team, game_of = defaultdict(list), {}
+    for p, (fecha, ck, A, B) in enumerate(games):
+        by_team[(fecha, A)].append(p)
+        by_team[(fecha, B)].append(p)
+        game_of[(fecha, ck, A)] = p
+        game_of[(fecha, ck, B)] = p
+
+    def first(p, team):      # 1 si team es el equipo A (local[p]=1 → team local)
+        return 1 if games[p][2] == team else 0
+
+    uf = _Parity(len(games))
+    paridad = h2h = 0
+    for tipo, ck_A, A, *rest in reglas:
+        B = rest[-1]
+        if A not in entities or B not in entities or A not in comp_sets.get(ck_A, ()):
+            continue
+        ck_B = rest[0] if tipo == "cross" else None
+        por_comp = ck_B and B in comp_sets.get(ck_B, ())
+        for fecha in range(1, num_fechas + 1):
+            pA = game_of.get((fecha, ck_A, A))
+            if pA is None:
+                continue
+            if tipo == "co_local":
+                rival = games[pA][3] if games[pA][2] == A else games[pA][2]
+                if rival == B:
+                    h2h += 1
+                    continue
+                games_B, same = by_team[(fecha, B)], 1
+            else:
+                pB = game_of.get((fecha, ck_B, B)) if por_comp else None
+                games_B = ([] if pB is None else [pB]) if por_comp else by_team[(fecha, B)]
+                same = 0
+            for pB in games_B:
+                # misma condición: local[pA] ^ local[pB] = sA ^ sB ; opuesta: ^1
+                rel = first(pA, A) ^ first(pB, B) ^ (0 if same else 1)
+                if not uf.union(pA, pB, rel):
+                    paridad += 1
+
+    aya = [n for n in ayacucho if n in entities]
+    forzadas = 0
+    for fecha in range(1, num_fechas + 1):
+        comps = defaultdict(lambda: [0, 0])   # raíz -> [locales si raíz=0, si raíz=1]
+        for n in aya:
+            for p in by_team[(fecha, n)]:
+                home_if_root0 = uf.parity(p) ^ (1 - first(p, n))
+                comps[uf.find(p)][0] += home_if_root0
+                comps[uf.find(p)][1] += 1 - home_if_root0
+        minimo = sum(min(c) for c in comps.values())
+        if minimo > 2:
+            forzadas += minimo - 2
+
+    detalle = {"paridad": paridad, "h2h": h2h, "ayacucho": forzadas}
+    return 10 * paridad + 10 * forzadas + h2h, detalle
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BÚSQUEDA
+# ══════════════════════════════════════════════════════════════════════════════
+
+_CTX = None
+
+def _init_worker(ctx):
+    global _CTX
+    _CTX = ctx
+
+def _score_worker(item):
+    i, schedule = item
+    score, detalle = score_schedule(*_CTX, schedule)
+    return score, i, detalle
+
+def _neighbor(schedule, rng):
+    """Vecino: intercambia dos equipos de una competencia, o cambia rot/espejo."""
+    ck = rng.choice(sorted(schedule))
+    orden, rot, espejo = schedule[ck]
+    nr = legs(len(orden))
+    new = dict(schedule)
+    if rng.random() < 0.8:
+        o = list(orden)
+        i, j = rng.sample(range(len(o)), 2)
+        o[i], o[j] = o[j], o[i]
+        new[ck] = (tuple(o), rot, espejo)
+    elif rng.random() < 0.5:
+        new[ck] = (orden, rng.randrange(nr), espejo)
+    else:
+        new[ck] = (orden, rot, rng.choice([m for m in range(nr) if m != nr - 1] or [0]))
+    return new
+
+def _improve_worker(item):
+    """Búsqueda local (acepta movimientos que no empeoran) desde un candidato."""
+    i, schedule, seed, iters = item
+    rng = random.Random(f"{seed}:{i}")
+    best, (best_score, best_det) = schedule, score_schedule(*_CTX, schedule)
+    for _ in range(iters):
+        cand = _neighbor(best, rng)
+        score, det = score_schedule(*_CTX, cand)
+        if score <= best_score:
+            best, best_score, best_det = cand, score, det
+    return best_score, i, best_det, best
+
+def _run(fn, items, ctx, workers):
+    if workers == 1:
+        _init_worker(ctx)
+        return [fn(item) for item in items]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(ctx,)) as pool:
+        return list(pool.map(fn, items, chunksize=max(1, len(items) // (4 * workers))))
+
+def search_schedules(competitions, reglas, ayacucho, num_fechas,
+                     n_candidates=200, top_k=3, seed=0, workers=None, local_iters=0):
+    """
+    Evalúa la agenda canónica + n_candidates-1 agendas aleatorias (RNG con
+    `seed`) en un pool de procesos. Si local_iters > 0, cada uno de los top_k
+    se refina con esa cantidad de pasos de búsqueda local (en paralelo).
+    Retorna los top_k como [(score, detalle, schedule)], ordenados por
+    (score, índice de candidato): el resultado es reproducible e independiente
+    de la cantidad de workers.
+    """
+    rng = random.Random(seed)
+    cands = [canonical_schedule(competitions)]
+    cands += [random_schedule(competitions, rng) for _ in range(n_candidates - 1)]
+
+    ctx = (competitions, list(reglas), list(ayacucho), num_fechas)
+    workers = workers or os.cpu_count() or 1
+    scored = _run(_score_worker, list(enumerate(cands)), ctx, workers)
+    scored.sort(key=lambda s: (s[0], s[1]))
+    best = [(score, i, detalle, cands[i]) for score, i, detalle in scored[:top_k]]
+
+    if local_iters > 0:
+        items = [(i, sched, seed, local_iters) for _, i, _, sched in best]
+        best = sorted(_run(_improve_worker, items, ctx, workers),
+                      key=lambda s: (s[0], s[1]))
+
+    return [(score, detalle, sched) for score, _, detalle, sched in best]
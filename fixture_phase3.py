@@ -0,0 +1,127 @@
+"""
+fixture_phase3.py  ·  Fase 3: día y horario de cada partido
+============================================================
+
+Sobre el fixture de fase 2 (localías fijas) asigna a cada partido un
+(día, horario) del fin de semana. Cada fecha es un modelo CP-SAT chico e
+independiente, así que se resuelven en paralelo en un pool de procesos:
+el trabajo crece con la cantidad de fechas, no con la temporada entera.
+
+Por fecha:
+  - cada partido ocupa DURACION[ck] turnos consecutivos de un mismo día
+    (inferiores juega sus categorías seguidas, femenino sus 4);
+  - capacidad por estadio: los equipos con el mismo estadioLocal forman un
+    grupo que comparte `canchas` canchas (1 por defecto) → AddCumulative;
+  - un equipo no puede jugar dos partidos superpuestos (entidades que
+    juegan más de una competencia) → AddNoOverlap;
+  - objetivo: jugar en DIA_PREFERIDO[ck] y lo más temprano posible.
+"""
+
+import os, time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from ortools.sat.python import cp_model
+
+DIAS     = ("sábado", "domingo")
+HORARIOS = ("09:00", "11:00", "13:00", "15:00", "17:00")     # turnos de 2 h
+
+DURACION = {"PRIMERA_A": 1, "PRIMERA_B": 1,
+            "INF_A": 3, "INF_B": 3, "INF_C": 3,
+            "FEMENINO": 2}
+DIA_PREFERIDO = {"PRIMERA_A": 1, "PRIMERA_B": 1,
+                 "INF_A": 0, "INF_B": 0, "INF_C": 0,
+                 "FEMENINO": 0}
+
+SIN_ESTADIO = "A confirmar"
+
+
+def stadium_capacity(equipos_data, canchas=None):
+    """
+    {estadioLocal: canchas} para cada grupo de equipos que comparten cancha.
+    `canchas` = overrides {estadio: n}; "A confirmar" no tiene tope.
+    """
+    canchas = canchas or {}
+    grupos = defaultdict(list)
+    for e in equipos_data:
+        est = e.get("estadioLocal") or SIN_ESTADIO
+        if est != SIN_ESTADIO:
+            grupos[est].append(e["nombre"])
+    return {est: canchas.get(est, 1) for est in sorted(grupos)}
+
+
+def _solve_fecha(item):
+    """Worker: un modelo por fecha. Retorna (fecha, status, {idx: (día, turno)})."""
+    fecha, games, capacity, max_time = item
+    S = len(HORARIOS)
+    model = cp_model.CpModel()
+    starts, por_estadio, por_equipo, costo = {}, defaultdict(list), defaultdict(list), []
+
+    for idx, ck, loc, vis, est in games:
+        dur = DURACION.get(ck, 1)
+        dom = cp_model.Domain.FromIntervals([[0, S - dur], [S, 2*S - dur]])
+        t = model.NewIntVarFromDomain(dom, f"t_{idx}")
+        iv = model.NewFixedSizeIntervalVar(t, dur, f"iv_{idx}")
+        starts[idx] = t
+
+        if est in capacity:
+            por_estadio[est].append(iv)
+        por_equipo[loc].append(iv)
+        por_equipo[vis].append(iv)
+
+        domingo = model.NewBoolVar(f"dom_{idx}")
+        model.Add(t >= S).OnlyEnforceIf(domingo)
+        model.Add(t < S).OnlyEnforceIf(domingo.Not())
+        fuera = domingo.Not() if DIA_PREFERIDO.get(ck, 0) == 1 else domingo
+        costo += [10 * fuera, t - S * domingo]      # día preferido, y temprano
+
+    for est, ivs in por_estadio.items():
+        if len(ivs) > 1:
+            model.AddCumulative(ivs, [1] * len(ivs), capacity[est])
+    for ivs in por_equipo.values():
+        if len(ivs) > 1:
+            model.AddNoOverlap(ivs)
+    model.Minimize(sum(costo))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(max_time)
+    solver.parameters.num_search_workers  = 1
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return fecha, status, {}
+    return fecha, status, {idx: divmod(solver.Value(t), S) for idx, t in starts.items()}
+
+
+def assign_slots(fixture, equipos_data, canchas=None, parallel=None, max_time=10.0,
+                 log=print):
+    """
+    Agrega "dia" y "horario" a cada partido de `fixture` (lista de dicts de
+    fase 2). Retorna (fixture nuevo, {fecha: status}). Las fechas sin
+    solución dejan dia/horario en None.
+    """
+    t0 = time.perf_counter()
+    capacity = stadium_capacity(equipos_data, canchas)
+    by_fecha = defaultdict(list)
+    for idx, g in enumerate(fixture):
+        by_fecha[g["fecha"]].append((idx, g["competencia"], g["local"], g["visitante"],
+                                     g.get("estadio", SIN_ESTADIO)))
+    items = [(f, by_fecha[f], capacity, max_time) for f in sorted(by_fecha)]
+
+    parallel = max(1, min(parallel or os.cpu_count() or 1, len(items)))
+    if parallel == 1:
+        results = [_solve_fecha(it) for it in items]
+    else:
+        with ProcessPoolExecutor(max_workers=parallel) as pool:
+            results = list(pool.map(_solve_fecha, items))
+
+    out = [dict(g, dia=None, horario=None) for g in fixture]
+    statuses = {}
+    for fecha, status, slots in results:
+        statuses[fecha] = status
+        for idx, (dia, turno) in slots.items():
+            out[idx]["dia"], out[idx]["horario"] = DIAS[dia], HORARIOS[turno]
+    fallidas = [f for f, st in statuses.items()
+                if st not in (cp_model.OPTIMAL, cp_model.FEASIBLE)]
+    log(f"   Fase 3: {len(items)} fechas · {len(capacity)} estadios · {parallel} en paralelo · "
+        f"{time.perf_counter() - t0:.1f}s" + (f" · ❌ sin horario: {fallidas}" if fallidas else ""))
+    return out, statuses
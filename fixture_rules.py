@@ -0,0 +1,169 @@
+"""
+fixture_rules.py  ·  Reglas de localía declarativas
+====================================================
+
+Las reglas cross / co_local viven en reglas.json (junto a equipos.json):
+
+  {"reglas": [
+      {"club": "Independiente (azul, A)", "tipo": "cross",
+       "competencia": "PRIMERA_A", "equipo": "Independiente",
+       "competencia_rival": null, "rival": "Independiente Femenino"},
+      {"tipo": "co_local", "competencia": "PRIMERA_B",
+       "equipo": "Loma Negra", "rival": "Loma Negra Femenino",
+       "nota": "EXCEPCIÓN: femenino co-local"}
+  ]}
+
+"club" y "nota" son documentación. load_reglas() las convierte a las tuplas
+de siempre (misma firma que FixtureEngine.cross / co_local), en el orden del
+archivo, y validate_reglas() las chequea contra las competencias armadas
+desde equipos.json. split_reglas() separa las válidas: el motor solo compila
+esas.
+
+Compilación: cada regla se traduce a un fragmento (lista de cláusulas sobre
+los literales local[p]). Como los índices p dependen de la fase 1, el
+fragmento se guarda bajo una clave = hash(regla) + hash(partidos de fase 1);
+RuleCache lo mantiene en memoria y, opcionalmente, en disco, así reconstruir
+el modelo con las mismas reglas y la misma agenda no recalcula nada. La
+clave incluye FORMATO_CACHE, que se sube al cambiar el compilador.
+"""
+
+import hashlib, json, os, tempfile
+
+TIPOS = {"cross": 5, "co_local": 4}     # tipo -> largo de la tupla
+
+# Versión del compilador de reglas (FixtureEngine.cross / co_local) y del
+# formato de los fragmentos. Entra en la clave del cache: subirla cuando
+# cambie qué cláusulas genera una regla, así los fragmentos viejos en disco
+# dejan de usarse.
+FORMATO_CACHE = 2
+
+
+def regla_from_dict(d):
+    """Objeto JSON → tupla de regla."""
+    tipo = d.get("tipo")
+    if tipo == "cross":
+        return ("cross", d["competencia"], d["equipo"], d.get("competencia_rival"), d["rival"])
+    if tipo == "co_local":
+        return ("co_local", d["competencia"], d["equipo"], d["rival"])
+    raise ValueError(f"Tipo de regla desconocido: {tipo!r}")
+
+def split_reglas(reglas, competitions):
+    """
+    Chequea cada regla contra {ck: {"entities": [...]}}. Retorna (reglas
+    válidas, errores); una regla con algún error queda afuera.
+    """
+    sets = {ck: set(c["entities"]) for ck, c in competitions.items()}
+    entities = set().union(*sets.values()) if sets else set()
+    validas, errores, vistas = [], [], set()
+    for i, r in enumerate(reglas, 1):
+        r = tuple(r)
+        errs = _errores_regla(i, r, sets, entities)
+        if not errs and r in vistas:
+            errs = [f"Regla {i} {r[0]} {r[2]} / {r[-1]}: duplicada"]
+        if errs:
+            errores += errs
+        else:
+            validas.append(r)
+            vistas.add(r)
+    return validas, errores
+
+def validate_reglas(reglas, competitions):
+    """Errores de split_reglas (lista vacía si todo está bien)."""
+    return split_reglas(reglas, competitions)[1]
+
+def _errores_regla(i, r, sets, entities):
+    if not r or not isinstance(r[0], str) or len(r) != TIPOS.get(r[0], -1):
+        return [f"Regla {i}: forma inválida {r!r}"]
+    tipo, ck_A, A, *rest = r
+    B = rest[-1]
+    pre = f"Regla {i} {tipo} {A} / {B}"
+    errores = []
+    if A == B:
+        errores.append(f"{pre}: equipo y rival son el mismo")
+    if ck_A not in sets:
+        errores.append(f"{pre}: competencia '{ck_A}' inexistente")
+    elif A not in sets[ck_A]:
+        errores.append(f"{pre}: '{A}' no juega {ck_A}")
+    if B not in entities:
+        errores.append(f"{pre}: '{B}' no juega ninguna competencia")
+    ck_B = rest[0] if tipo == "cross" else None
+    if ck_B is not None:
+        if ck_B not in sets:
+            errores.append(f"{pre}: competencia '{ck_B}' inexistente")
+        elif B not in sets[ck_B]:
+            errores.append(f"{pre}: '{B}' no juega {ck_B}")
+    return errores
+
+def load_reglas(path, competitions=None):
+    """
+    Lee reglas.json → lista de tuplas. Si se pasan `competitions`, valida y
+    levanta ValueError con todos los errores juntos.
+    """
+    with open(path, "r", encoding="utf-8") as fh:
+        reglas = [regla_from_dict(d) for d in json.load(fh)["reglas"]]
+    if competitions is not None:
+        errores = validate_reglas(reglas, competitions)
+        if errores:
+            raise ValueError(f"{path}: {len(errores)} reglas inválidas\n  " + "\n  ".join(errores))
+    return reglas
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FRAGMENTOS COMPILADOS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _digest(obj):
+    return hashlib.sha256(json.dumps(obj, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+def phase1_key(store, num_fechas):
+    """Hash de la fase 1 (GameStore) + FORMATO_CACHE: clave de un archivo de fragmentos."""
+    return _digest([FORMATO_CACHE, num_fechas, store.digest()])
+
+def regla_key(regla):
+    return _digest(list(regla))
+
+
+class RuleCache:
+    """
+    Fragmentos compilados por (fase 1, regla). En disco, un archivo por hash
+    de fase 1 en `cache_dir` (None = solo memoria).
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.mem   = {}     # phase1_key -> {regla_key: [[lits], ...]}
+        self.dirty = set()
+
+    def _path(self, pkey):
+        return os.path.join(self.cache_dir, f"reglas_{pkey}.json")
+
+    def _table(self, pkey):
+        if pkey not in self.mem:
+            table = {}
+            if self.cache_dir and os.path.exists(self._path(pkey)):
+                try:
+                    with open(self._path(pkey), "r", encoding="utf-8") as fh:
+                        table = json.load(fh)
+                except (OSError, ValueError):
+                    table = {}      # cache corrupto: se recompila
+            self.mem[pkey] = table
+        return self.mem[pkey]
+
+    def get(self, pkey, regla):
+        return self._table(pkey).get(regla_key(regla))
+
+    def put(self, pkey, regla, clauses):
+        self._table(pkey)[regla_key(regla)] = [list(c) for c in clauses]
+        self.dirty.add(pkey)
+
+    def save(self):
+        """Escribe las tablas modificadas (atómico: tmp + os.replace)."""
+        if not self.cache_dir:
+            self.dirty.clear()
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for pkey in sorted(self.dirty):
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(self.mem[pkey], fh)
+            os.replace(tmp, self._path(pkey))
+        self.dirty.clear()
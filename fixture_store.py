@@ -0,0 +1,110 @@
+"""
+fixture_store.py  ·  Almacén columnar de partidos
+==================================================
+
+Reemplaza la lista de tuplas (fecha, ck, A, B) y los índices por dict:
+
+  teams / comps        nombres internados; tidx / cidx: nombre → id
+  fecha, comp,         columnas paralelas array('i') (una fila por partido);
+  home, away           home = equipo A (local si local[p] = 1)
+
+  (fecha, equipo) → partidos    índice CSR: offsets + ids, en orden de p
+
+Las columnas exponen el buffer, así np() da vistas NumPy sin copia para
+los consumidores vectorizados (fixture_validator). Los helpers del motor
+trabajan con ids enteros y solo tocan los partidos que consultan.
+"""
+
+import hashlib
+from array import array
+
+import numpy as np
+
+
+def _csr(keys, ids, n_keys):
+    """Offsets + ids agrupados por clave (estable: respeta el orden de `ids`)."""
+    order = np.lexsort((ids, keys))
+    counts = np.bincount(keys, minlength=n_keys)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    return array("i", offsets.astype(np.intc).tobytes()), array("i", ids[order].astype(np.intc).tobytes())
+
+
+class GameStore:
+    """Partidos de una temporada como columnas de enteros + índices CSR."""
+
+    __slots__ = ("teams", "tidx", "comps", "cidx", "num_fechas",
+                 "fecha", "comp", "home", "away",
+                 "_dt_off", "_dt_ids")
+
+    def __init__(self, games, num_fechas=0):
+        """games: iterable de (fecha, ck, A, B)."""
+        games = list(games)
+        self.teams = sorted({t for g in games for t in g[2:]})
+        self.tidx  = {t: i for i, t in enumerate(self.teams)}
+        self.comps = list(dict.fromkeys(g[1] for g in games))    # orden de aparición
+        self.cidx  = {c: i for i, c in enumerate(self.comps)}
+        self.num_fechas = max([num_fechas] + [g[0] for g in games])
+
+        self.fecha = array("i", (g[0] for g in games))
+        self.comp  = array("i", (self.cidx[g[1]] for g in games))
+        self.home  = array("i", (self.tidx[g[2]] for g in games))
+        self.away  = array("i", (self.tidx[g[3]] for g in games))
+
+        T, F1 = len(self.teams), self.num_fechas + 1
+        f = self.np("fecha")
+        p = np.arange(len(games))
+        # cada partido aparece dos veces en (fecha, equipo): por A y por B
+        self._dt_off, self._dt_ids = _csr(
+            np.concatenate([f * T + self.np("home"), f * T + self.np("away")]),
+            np.concatenate([p, p]), F1 * T)
+
+    def np(self, column):
+        """Vista NumPy (sin copia) de una columna."""
+        return np.frombuffer(getattr(self, column), dtype=np.intc)
+
+    def __len__(self):
+        return len(self.fecha)
+
+    def __getitem__(self, p):
+        """Fila p como (fecha, ck, A, B), como la vieja all_games[p]."""
+        return (self.fecha[p], self.comps[self.comp[p]],
+                self.teams[self.home[p]], self.teams[self.away[p]])
+
+    def __iter__(self):
+        return (self[p] for p in range(len(self)))
+
+    # ── Consultas por id ──────────────────────────────────────────────────────
+
+    def at(self, fecha, t):
+        """Partidos del equipo t en la fecha (array, en orden de p)."""
+        if not 0 < fecha <= self.num_fechas:
+            return self._dt_ids[0:0]
+        k = fecha * len(self.teams) + t
+        return self._dt_ids[self._dt_off[k]:self._dt_off[k + 1]]
+
+    def game_in(self, fecha, c, t):
+        """
+        Partido del equipo t en (fecha, competencia c), o None. Recorre el
+        slice (fecha, t): a lo sumo un partido por competencia del equipo.
+        """
+        comp = self.comp
+        for p in self.at(fecha, t):
+            if comp[p] == c:
+                return p
+        return None
+
+    def opponent(self, p, t):
+        return self.away[p] if self.home[p] == t else self.home[p]
+
+    def lit_home(self, p, t):
+        """Literal entero (ver fixture_constraints): t es local en p."""
+        return p if self.home[p] == t else ~p
+
+    def digest(self):
+        """Hash del contenido: equipos, competencias y columnas."""
+        h = hashlib.sha256()
+        h.update("\x00".join(self.teams + ["|"] + self.comps).encode("utf-8"))
+        h.update(str(self.num_fechas).encode())
+        for col in (self.fecha, self.comp, self.home, self.away):
+            h.update(col.tobytes())
+        return h.hexdigest()[:16]
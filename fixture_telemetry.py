@@ -0,0 +1,93 @@
+"""
+fixture_telemetry.py  ·  Telemetría estructurada
+=================================================
+
+Registros JSON (uno por línea) en lugar de raspar el log de CP-SAT:
+
+  {"run": ..., "t": 0.41, "evento": "fase", "fase": "reglas", "s": 0.02,
+   "cons": 1568, "clausulas": {"cross": [736, 730], "co_local": [844, 838]}}
+  {"run": ..., "t": 3.10, "evento": "solucion", "objetivo": 31, "cota": 27,
+   "gap": 0.129, "wall_s": 2.6}
+  {"run": ..., "t": 9.80, "evento": "resumen", "fases": {...}, ...}
+
+Una fase que levanta deja su registro con "error": "<Tipo>: <mensaje>".
+
+Telemetry acumula los registros en memoria y, si tiene `path`, los agrega
+al archivo .jsonl (modo append: un historial por temporada). summary()
+cierra la corrida con un registro "resumen" que también se guarda aparte.
+"""
+
+import json, time
+from contextlib import contextmanager
+from datetime import datetime
+
+from ortools.sat.python import cp_model
+
+
+class Telemetry:
+    """Registros JSON-lines con tiempos por fase."""
+
+    def __init__(self, path=None):
+        self.path    = path
+        self.run     = datetime.now().isoformat(timespec="seconds")
+        self.t0      = time.perf_counter()
+        self.records = []
+
+    def event(self, evento, **data):
+        rec = {"run": self.run, "t": round(time.perf_counter() - self.t0, 4),
+               "evento": evento, **data}
+        self.records.append(rec)
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        return rec
+
+    @contextmanager
+    def phase(self, fase, **data):
+        """
+        Cronometra un bloque; el bloque puede agregar campos al dict que
+        recibe. Si el bloque levanta, el registro sale igual con "error".
+        """
+        t = time.perf_counter()
+        try:
+            yield data
+        except BaseException as exc:
+            data["error"] = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            self.event("fase", fase=fase, s=round(time.perf_counter() - t, 4), **data)
+
+    def summary(self, path=None, **data):
+        """Registro final: tiempo por fase (sumado), soluciones y `data`."""
+        fases = {}
+        for r in self.records:
+            if r["evento"] == "fase":
+                fases[r["fase"]] = round(fases.get(r["fase"], 0) + r["s"], 4)
+        sols = [r for r in self.records if r["evento"] == "solucion"]
+        rec = self.event("resumen", fases=fases, soluciones=len(sols),
+                         primera_s=sols[0]["wall_s"] if sols else None,
+                         ultima_s=sols[-1]["wall_s"] if sols else None,
+                         total_s=round(time.perf_counter() - self.t0, 4), **data)
+        if path:
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(rec, fh, indent=4, ensure_ascii=False)
+        return rec
+
+
+def gap(objective, bound):
+    """Gap relativo |obj − cota| / max(1, |obj|)."""
+    return abs(objective - bound) / max(1.0, abs(objective))
+
+
+class ProgressCallback(cp_model.CpSolverSolutionCallback):
+    """Un registro "solucion" por cada solución mejorante de CP-SAT."""
+
+    def __init__(self, telemetry):
+        super().__init__()
+        self.telemetry = telemetry
+
+    def on_solution_callback(self):
+        obj, bound = self.ObjectiveValue(), self.BestObjectiveBound()
+        self.telemetry.event("solucion", objetivo=obj, cota=bound,
+                             gap=round(gap(obj, bound), 4),
+                             wall_s=round(self.WallTime(), 4))
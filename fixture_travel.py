@@ -0,0 +1,94 @@
+"""
+fixture_travel.py  ·  Distancias de viaje
+==========================================
+
+distancias.json guarda una matriz localidad × localidad en km (archivo
+local, sin consultas de red). Se carga una vez por proceso a un array NumPy
+(cache por ruta + mtime) y los equipos se mapean a un índice de localidad:
+la distancia de cada partido es una indexación vectorizada
+
+    km[p] = D[loc[home[p]], loc[away[p]]]
+
+sin dicts por partido al construir el modelo.
+
+La localidad de una entidad es su `localidad` o la de su clubPadre. Las
+localidades desconocidas usan una fila/columna extra de ceros.
+"""
+
+import json, os
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+
+DISTANCIAS_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "distancias.json")
+KM_UNIDAD = 10          # el objetivo cuenta km en unidades de 10 km
+KM_LARGO  = 100         # viaje "largo" para el tope de viajes largos seguidos
+
+
+@lru_cache(maxsize=8)
+def _load(path, mtime):
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    locs = data["localidades"]
+    idx  = {l: i for i, l in enumerate(locs)}
+    D = np.full((len(locs) + 1, len(locs) + 1), -1, dtype=np.int32)
+    np.fill_diagonal(D, 0)
+    D[-1, :] = D[:, -1] = 0                         # localidad desconocida
+    for a, b, km in data["km"]:
+        if a not in idx or b not in idx:
+            raise ValueError(f"distancias: localidad desconocida en [{a!r}, {b!r}]")
+        D[idx[a], idx[b]] = D[idx[b], idx[a]] = km
+    faltan = [(locs[i], locs[j]) for i, j in zip(*np.nonzero(D < 0)) if i < j]
+    if faltan:
+        raise ValueError(f"distancias: faltan {len(faltan)} pares, p.ej. {faltan[0]}")
+    D.flags.writeable = False
+    return idx, D
+
+def load_distancias(path=DISTANCIAS_JSON):
+    """Retorna ({localidad: índice}, matriz D de solo lectura)."""
+    path = os.path.abspath(path)
+    return _load(path, os.path.getmtime(path))
+
+def team_localities(equipos_data, teams, idx):
+    """
+    Índice de localidad por id de equipo (array alineado con `teams`) y la
+    lista de equipos sin localidad conocida (índice len(idx) → distancia 0).
+    """
+    by_name = {e["nombre"]: e for e in equipos_data}
+
+    def localidad(n):
+        e = by_name.get(n, {})
+        return e.get("localidad") or by_name.get(e.get("clubPadre"), {}).get("localidad")
+
+    li = np.array([idx.get(localidad(t), len(idx)) for t in teams], dtype=np.intp)
+    return li, [t for t, i in zip(teams, li) if i == len(idx)]
+
+def game_distances(store, li, D):
+    """km de cada partido del GameStore (quien sea visitante recorre lo mismo)."""
+    return D[li[store.np("home")], li[store.np("away")]]
+
+def travel_by_team(fixture, equipos_data, path=DISTANCIAS_JSON, long_km=KM_LARGO):
+    """
+    Sobre un fixture exportado: {equipo: (km como visitante, máx. fechas
+    seguidas con viaje largo)}.
+    """
+    idx, D = load_distancias(path)
+    teams = sorted({t for g in fixture for t in (g["local"], g["visitante"])})
+    li, _ = team_localities(equipos_data, teams, idx)
+    loc = dict(zip(teams, li))
+    km, largos = defaultdict(int), defaultdict(set)
+    for g in fixture:
+        d = int(D[loc[g["local"]], loc[g["visitante"]]])
+        km[g["visitante"]] += d
+        if d >= long_km:
+            largos[g["visitante"]].add(g["fecha"])
+    out = {}
+    for t in teams:
+        racha = best = 0
+        prev = None
+        for f in sorted(largos[t]):
+            racha = racha + 1 if prev == f - 1 else 1
+            best, prev = max(best, racha), f
+        out[t] = (km[t], best)
+    return out
@@ -0,0 +1,309 @@
+"""
+fixture_validator.py  ·  Validación independiente de un fixture
+================================================================
+
+Carga cualquier fixture_output.json / .csv (incluso editado a mano) y
+verifica todas las reglas sin volver a resolver nada.
+
+El fixture se convierte una sola vez en una matriz densa de condición
+
+    cond[c, t, f]  int8   +1 local · −1 visitante · 0 libre
+
+(competencia × equipo × fecha) más la matriz de rivales opp[c, t, f], y cada
+regla se chequea como operación vectorizada de NumPy sobre esas matrices:
+
+  cross / co_local   todos los pares de reglas.json (mismo criterio que el modelo,
+                     incluido el bypass H2H de co_local)
+  ayacucho           ≤ 2 locales simultáneos entre los clubes de AYACUCHO
+  ventanas           ninguna ventana de 4 fechas con 4 locales o 4 visitas
+  equidad            si un equipo de un torneo tiene racha de 3, todos la tienen
+  estadio            equipos con el mismo estadioLocal no son locales a la vez
+                     (salvo regla co_local explícita entre ellos)
+  round-robin        cada par juega exactamente una vez con cada uno de local,
+                     y nadie juega dos veces la misma fecha en una competencia
+
+Las ventanas se cuentan con el mismo alcance de rachas que usó el motor:
+el rachas_scope de fixture_summary.json junto al fixture si existe, si no
+el default del motor ("global"); --scope lo fuerza.
+
+Uso:
+  python fixture_validator.py fixture_output.json
+  python fixture_validator.py fixture_output.csv --json
+Sale con código 1 si alguna verificación falla (apto para CI).
+"""
+
+import argparse, csv, json, os, sys, time
+
+import numpy as np
+
+from fixture_generator import (AYACUCHO, COMP_DEFS, EQUIPOS_JSON, REGLAS_JSON,
+                               STREAK_SCOPES, SUMMARY_JSON, build_competitions,
+                               load_equipos)
+from fixture_rules import load_reglas
+from fixture_store import GameStore
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CARGA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def comp_key(label, known=tuple(ck for ck, _, _ in COMP_DEFS)):
+    """'PRIMERA A' / 'INF A 10ª' / 'FEMENINO FEM SUB-12' → 'PRIMERA_A' / 'INF_A' / 'FEMENINO'."""
+    norm = label.strip().upper().replace(" ", "_")
+    for ck in sorted(known, key=len, reverse=True):
+        if norm == ck or norm.startswith(ck + "_"):
+            return ck
+    return norm
+
+def load_rows(path):
+    """Lee un fixture .json o .csv → [{competencia, fecha, local, visitante}]."""
+    with open(path, "r", encoding="utf-8", newline="") as fh:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(fh))
+        else:
+            rows = json.load(fh)
+    return [{"competencia": r["competencia"], "fecha": int(r["fecha"]),
+             "local": r["local"].strip(), "visitante": r["visitante"].strip()}
+            for r in rows]
+
+
+class FixtureMatrix:
+    """Fixture deduplicado por competencia + matrices cond/opp."""
+
+    __slots__ = ("comps", "cidx", "teams", "tidx", "num_fechas",
+                 "games", "cond", "opp", "dobles", "inconsistencias")
+
+    def __init__(self, rows):
+        # Las filas por categoría (INF A 10ª, INF A 11ª, ...) son el mismo
+        # partido de la competencia: se colapsan y se marcan inconsistencias.
+        orient = {}
+        self.inconsistencias = []
+        for r in rows:
+            ck = comp_key(r["competencia"])
+            key = (ck, r["fecha"], frozenset((r["local"], r["visitante"])))
+            prev = orient.setdefault(key, r["local"])
+            if prev != r["local"]:
+                self.inconsistencias.append((ck, r["fecha"], r["local"], r["visitante"]))
+        self.games = sorted((ck, f, loc, next(iter(pair - {loc}), loc))
+                            for (ck, f, pair), loc in orient.items())
+
+        # Mismo almacén columnar que el motor: home = local, away = visitante
+        store = GameStore((f, ck, loc, vis) for ck, f, loc, vis in self.games)
+        self.comps, self.cidx = store.comps, store.cidx
+        self.teams, self.tidx = store.teams, store.tidx
+        self.num_fechas = store.num_fechas
+
+        c, h, v = store.np("comp"), store.np("home"), store.np("away")
+        f = store.np("fecha") - 1
+
+        shape = (len(self.comps), len(self.teams), self.num_fechas)
+        self.cond = np.zeros(shape, np.int8)
+        self.opp  = np.full(shape, -1, np.int32)
+        self.cond[c, h, f] = 1
+        self.cond[c, v, f] = -1
+        self.opp[c, h, f] = v
+        self.opp[c, v, f] = h
+
+        count = np.zeros(shape, np.int16)
+        np.add.at(count, (c, h, f), 1)
+        np.add.at(count, (c, v, f), 1)
+        self.dobles = [(self.comps[ci], self.teams[ti], fi + 1)
+                       for ci, ti, fi in zip(*np.nonzero(count > 1))]
+
+# ══════════════════════════════════════════════════════════════════════════════
+# VERIFICACIONES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _check(nombre, detalle):
+    return {"check": nombre, "violaciones": len(detalle), "detalle": detalle}
+
+def _fechas(mask):
+    return [int(i) + 1 for i in np.nonzero(mask)[0]]
+
+def check_rules(fm, reglas):
+    """cross / co_local con la misma semántica que FixtureEngine."""
+    out = []
+    for regla in reglas:
+        tipo, ck_A, A, *rest = regla
+        B = rest[-1]
+        if A not in fm.tidx or B not in fm.tidx or ck_A not in fm.cidx:
+            continue
+        iA, iB = fm.tidx[A], fm.tidx[B]
+        a = fm.cond[fm.cidx[ck_A], iA]                       # (F,)
+        ck_B = rest[0] if tipo == "cross" else None
+        if ck_B in fm.cidx and fm.cond[fm.cidx[ck_B], iB].any():
+            b = fm.cond[fm.cidx[ck_B], iB][None, :]          # (1, F)
+        else:
+            b = fm.cond[:, iB]                               # (C, F) global
+        if tipo == "cross":
+            bad = (a != 0) & ((b == a) & (b != 0)).any(0)
+        else:
+            h2h = fm.opp[fm.cidx[ck_A], iA] == iB
+            bad = (a != 0) & ~h2h & ((b == -a) & (b != 0)).any(0)
+        out += [{"regla": list(regla), "fecha": f} for f in _fechas(bad)]
+    return _check("reglas cross/co_local", out)
+
+def check_ayacucho(fm, ayacucho, tope=2):
+    idx = [fm.tidx[n] for n in ayacucho if n in fm.tidx]
+    if not idx:
+        return _check("ayacucho ≤ 2 locales", [])
+    locales = (fm.cond[:, idx] == 1).sum(axis=(0, 1))       # (F,)
+    return _check("ayacucho ≤ 2 locales",
+                  [{"fecha": f, "locales": int(locales[f-1])} for f in _fechas(locales > tope)])
+
+def _windows(x, k):
+    """Suma de ventanas de k fechas sobre el último eje."""
+    cs = np.concatenate([np.zeros(x.shape[:-1] + (1,), np.int32),
+                         np.cumsum(x, axis=-1, dtype=np.int32)], axis=-1)
+    return cs[..., k:] - cs[..., :-k]
+
+def _sequences(fm, scope):
+    """(etiquetas, home, away) con una fila por secuencia de rachas."""
+    home, away = (fm.cond == 1), (fm.cond == -1)
+    if scope == "global":
+        return fm.teams, home.sum(0), away.sum(0)
+    ci, ti = np.nonzero((fm.cond != 0).any(-1))
+    labels = [f"{fm.teams[t]} [{fm.comps[c]}]" for c, t in zip(ci, ti)]
+    return labels, home[ci, ti], away[ci, ti]
+
+def check_windows(fm, scope="global"):
+    labels, home, away = _sequences(fm, scope)
+    out = []
+    for nombre, seq in (("local", home), ("visitante", away)):
+        rows, starts = np.nonzero(_windows(seq, 4) >= 4)
+        out += [{"equipo": labels[r], "condicion": nombre, "fechas": [int(s) + 1, int(s) + 4]}
+                for r, s in zip(rows, starts)]
+    return _check(f"máx 3 seguidos ({scope})", out)
+
+def streak_counts(fm):
+    """Rachas de 3 por (competencia, equipo): matriz (C, T) de int."""
+    home, away = (fm.cond == 1), (fm.cond == -1)
+    return ((_windows(home, 3) == 3).sum(-1) + (_windows(away, 3) == 3).sum(-1))
+
+def check_equity(fm):
+    counts = streak_counts(fm)
+    plays  = (fm.cond != 0).any(-1)                           # (C, T)
+    out = []
+    for c, ck in enumerate(fm.comps):
+        con = counts[c][plays[c]]
+        if con.size and con.max() > 0 and con.min() == 0:
+            sin = [fm.teams[t] for t in np.nonzero(plays[c] & (counts[c] == 0))[0]]
+            out.append({"competencia": ck, "sin_racha": sin})
+    return _check("equidad de rachas", out)
+
+def check_stadiums(fm, equipos_data, reglas):
+    juntos = {frozenset((r[2], r[-1])) for r in reglas if r[0] == "co_local"}
+    grupos = {}
+    for e in equipos_data:
+        est = e.get("estadioLocal")
+        if est and est != "A confirmar" and e["nombre"] in fm.tidx:
+            grupos.setdefault(est, []).append(fm.tidx[e["nombre"]])
+
+    home_any = (fm.cond == 1).any(0).astype(np.int32)       # (T, F)
+    out = []
+    for est, idx in sorted(grupos.items()):
+        if len(idx) < 2: continue
+        sub = home_any[idx]
+        both = sub @ sub.T                                   # fechas con ambos locales
+        for i, j in zip(*np.nonzero(np.triu(both, 1))):
+            A, B = fm.teams[idx[i]], fm.teams[idx[j]]
+            if frozenset((A, B)) in juntos: continue
+            out.append({"estadio": est, "equipos": [A, B],
+                        "fechas": _fechas(sub[i] & sub[j])})
+    return _check("canchas compartidas", out)
+
+def check_round_robin(fm, competitions=None):
+    out = [{"doble_partido": list(d)} for d in fm.dobles]
+    out += [{"inconsistente": list(i)} for i in fm.inconsistencias]
+    for ck in fm.comps:
+        members = (competitions or {}).get(ck, {}).get("entities") or \
+                  sorted({t for g in fm.games if g[0] == ck for t in g[2:]})
+        pos = {t: i for i, t in enumerate(members)}
+        n = len(members)
+        H = np.zeros((n, n), np.int16)                      # H[i, j]: i local vs j
+        games = [g for g in fm.games if g[0] == ck and g[2] in pos and g[3] in pos]
+        if games:
+            np.add.at(H, ([pos[g[2]] for g in games], [pos[g[3]] for g in games]), 1)
+        off = ~np.eye(n, dtype=bool)
+        for i, j in zip(*np.nonzero(off & (H != 1))):
+            out.append({"competencia": ck, "local": members[i],
+                        "visitante": members[j], "partidos": int(H[i, j])})
+    return _check("round-robin ida y vuelta", out)
+
+def validate(rows, equipos_data=None, reglas=None, ayacucho=AYACUCHO,
+             scope="global"):
+    """Corre todas las verificaciones (reglas=None → reglas.json). Retorna (checks, segundos)."""
+    if reglas is None:
+        reglas = load_reglas(REGLAS_JSON)
+    t0 = time.perf_counter()
+    fm = FixtureMatrix(rows)
+    competitions = build_competitions(equipos_data) if equipos_data else None
+    checks = [
+        check_round_robin(fm, competitions),
+        check_rules(fm, reglas),
+        check_ayacucho(fm, ayacucho),
+        check_windows(fm, scope),
+        check_equity(fm),
+    ]
+    if equipos_data:
+        checks.append(check_stadiums(fm, equipos_data, reglas))
+    return checks, time.perf_counter() - t0
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CLI
+# ══════════════════════════════════════════════════════════════════════════════
+
+def print_checks(checks, elapsed, max_detalle=5):
+    print("=== VALIDACIÓN DEL FIXTURE ===")
+    for c in checks:
+        n = c["violaciones"]
+        print(f"  {'✅' if n == 0 else f'❌ {n}':<7} {c['check']}")
+        for d in c["detalle"][:max_detalle]:
+            print(f"           {json.dumps(d, ensure_ascii=False)}")
+        if n > max_detalle:
+            print(f"           … {n - max_detalle} más")
+    print(f"\n⏱  {elapsed*1000:.1f} ms")
+
+def summary_scope(fixture_path, default="global"):
+    """rachas_scope del fixture_summary.json que acompaña al fixture, o `default`."""
+    path = os.path.join(os.path.dirname(os.path.abspath(fixture_path)),
+                        os.path.basename(SUMMARY_JSON))
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            scope = json.load(fh).get("rachas_scope")
+    except (OSError, ValueError):
+        return default
+    return scope if scope in STREAK_SCOPES else default
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Valida un fixture JSON/CSV contra todas las reglas.")
+    ap.add_argument("fixture", nargs="?", default=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "fixture_output.json"))
+    ap.add_argument("--equipos", default=EQUIPOS_JSON)
+    ap.add_argument("--reglas", default=REGLAS_JSON, metavar="JSON")
+    ap.add_argument("--scope", default=None, choices=STREAK_SCOPES,
+                    help="rachas sumando competencias o por equipo y competencia "
+                         "(default: el de fixture_summary.json, o global)")
+    ap.add_argument("--json", action="store_true", help="salida JSON completa")
+    args = ap.parse_args(argv)
+
+    try:
+        rows = load_rows(args.fixture)
+        reglas = load_reglas(args.reglas)
+    except FileNotFoundError as exc:
+        sys.exit(f"❌ No se encontró '{exc.filename}'.")
+    except ValueError as exc:
+        sys.exit(f"❌ {exc}")
+    equipos_data = load_equipos(args.equipos) if os.path.exists(args.equipos) else None
+
+    scope = args.scope or summary_scope(args.fixture)
+    checks, elapsed = validate(rows, equipos_data, reglas, scope=scope)
+    if args.json:
+        print(json.dumps({"checks": checks, "ms": round(elapsed * 1000, 2)},
+                         indent=2, ensure_ascii=False))
+    else:
+        print_checks(checks, elapsed)
+    return 1 if any(c["violaciones"] for c in checks) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())